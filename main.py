@@ -7,15 +7,29 @@ This file uses Actor context manager directly so CLI can detect this as a Python
 from apify import Actor
 import asyncio
 from src.main import run_scraper
+from src.services.reddit_service import get_reddit_service
+
+try:
+    import uvloop
+except ImportError:  # uvloop is not installed on Windows
+    uvloop = None
 
 async def main():
     """Main entry point with Actor context manager"""
     async with Actor:
         # Get input configuration
         input_data = await Actor.get_input()
-        # Run the scraper logic
-        await run_scraper(input_data)
+        # Run the scraper logic; the Reddit session is closed on exit
+        async with get_reddit_service():
+            await run_scraper(input_data)
+
+def run():
+    """Run the Actor, on the uvloop event loop when it is available"""
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run()
 
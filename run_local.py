@@ -58,12 +58,11 @@ def main():
     print("-" * 50)
     
     # Now import and run the actor
-    import asyncio
-    from main import main as actor_main
+    from main import run as run_actor
     
     # Run the actor
     try:
-        asyncio.run(actor_main())
+        run_actor()
     except KeyboardInterrupt:
         print("\nInterrupted by user")
         sys.exit(130)
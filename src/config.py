@@ -8,6 +8,40 @@ REDDIT_BASE_URL = "https://old.reddit.com"
 # Use a realistic browser User-Agent to avoid 403 errors
 REDDIT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
+# HTTP Connection Pool
+# All requests go to one host, so the per-host limit bounds open connections;
+# idle keep-alive connections are reused instead of paying a new TLS handshake
+HTTP_CONNECTION_LIMIT = 64
+HTTP_CONNECTION_LIMIT_PER_HOST = 16
+HTTP_KEEPALIVE_TIMEOUT_SECONDS = 60
+DNS_CACHE_TTL_SECONDS = 300
+
+# HTTP Backend
+# "aiohttp" (default) or "curl_cffi"; curl_cffi impersonates Chrome's TLS
+# fingerprint, which Reddit blocks far less often (requires the optional
+# curl_cffi package)
+HTTP_BACKEND = "aiohttp"
+CURL_CFFI_IMPERSONATE = "chrome124"
+
+# HTTP statuses retried with backoff (403 is Reddit's anti-bot block)
+RETRY_STATUS_CODES = frozenset({403, 429, 500, 502, 503, 504})
+# Longest Retry-After honored; a request waiting longer would hold its
+# concurrency slot for the rest of the run
+MAX_RETRY_AFTER_SECONDS = 60
+
+# Response Cache (used when the useResponseCache input is enabled)
+# Named store so cached responses survive across runs
+RESPONSE_CACHE_STORE_NAME = "reddit-response-cache"
+# Only comment threads are cached: listings change too quickly to be worth
+# keeping, and the store never grows with listing pages
+COMMENTS_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# HTTP Timeouts (per request attempt)
+HTTP_TOTAL_TIMEOUT_SECONDS = 20
+# Bounds the TCP/TLS handshake only, not the wait for a pooled connection
+HTTP_CONNECT_TIMEOUT_SECONDS = 5
+HTTP_READ_TIMEOUT_SECONDS = 10
+
 # API Limits
 MAX_POSTS_PER_REQUEST = 100
 MAX_COMMENTS_PER_REQUEST = 100
@@ -23,4 +57,15 @@ VALID_SORT_OPTIONS = ["new", "hot", "top", "rising"]
 VALID_TIME_FILTERS = ["hour", "day", "week", "month", "year", "all"]
 
 # Rate Limiting
+# After a rate limit window resets with its size unknown, one request is
+# let through per this many seconds until a response reports the budget
+RATE_LIMIT_PROBE_INTERVAL_SECONDS = 1.0
+# Upper bound of the random delay applied before each subreddit request
 DELAY_BETWEEN_SUBREDDITS_SECONDS = 1.0
+# Maximum number of subreddits fetched concurrently
+MAX_CONCURRENT_SUBREDDITS = 5
+# Maximum number of comment requests in flight per listing. Concurrent
+# subreddits each run their own batch, so up to MAX_CONCURRENT_SUBREDDITS
+# times this many requests queue for the HTTP_CONNECTION_LIMIT_PER_HOST
+# pooled connections
+MAX_CONCURRENT_COMMENT_REQUESTS = 16
@@ -10,8 +10,12 @@ Last updated: 2024
 """
 
 import asyncio
+import io
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
 from apify import Actor
 
@@ -21,8 +25,11 @@ from src.config import (
     DEFAULT_SORT,
     DEFAULT_TIME_FILTER,
     DELAY_BETWEEN_SUBREDDITS_SECONDS,
+    MAX_CONCURRENT_SUBREDDITS,
+    RESPONSE_CACHE_STORE_NAME,
 )
-from src.services.reddit_service import RedditService
+from src.services.reddit_service import RedditService, get_reddit_service
+from src.services.response_cache import ResponseCache
 from src.utils.helpers import (
     export_posts_to_csv,
     export_posts_with_comments_to_csv,
@@ -30,6 +37,71 @@ from src.utils.helpers import (
 )
 
 
+async def push_posts_to_dataset(posts: List[Dict]) -> None:
+    """
+    Push posts to the default dataset in a single call
+
+    The SDK serializes the items off the event loop and splits them into
+    size-limited API requests itself, so no extra batching is done here.
+
+    Args:
+        posts: List of post dictionaries
+    """
+    if posts:
+        await Actor.push_data(posts)
+
+
+async def save_summary(
+    total_posts: int,
+    subreddits_count: int,
+    search_query: str,
+    started_at: float,
+    finished: bool,
+) -> None:
+    """
+    Save run summary statistics to the key-value store
+
+    Args:
+        total_posts: Number of posts saved to the dataset so far
+        subreddits_count: Number of subreddits requested
+        search_query: Search query (empty if none)
+        started_at: time.perf_counter() value when the run started
+        finished: Whether scraping has completed
+    """
+    await Actor.set_value(
+        "summary",
+        {
+            "totalPosts": total_posts,
+            "subredditsScraped": subreddits_count,
+            "searchQuery": search_query or None,
+            "timestamp": datetime.now().isoformat(),
+            "durationSeconds": round(time.perf_counter() - started_at, 3),
+            "finished": finished,
+        },
+    )
+
+
+async def fetch_comments_for_posts(
+    reddit_service: RedditService,
+    posts: List[Dict],
+    max_comments_per_post: int,
+) -> None:
+    """
+    Fetch comments for posts in one batch and attach them to each post
+
+    Args:
+        reddit_service: RedditService instance
+        posts: List of posts (updated in place with a "comments" key)
+        max_comments_per_post: Max comments per post
+    """
+    comments_by_post = await reddit_service.get_comments_for_posts(
+        posts, max_comments=max_comments_per_post
+    )
+    for post in posts:
+        if post["id"] in comments_by_post:
+            post["comments"] = comments_by_post[post["id"]]
+
+
 async def scrape_subreddits(
     reddit_service: RedditService,
     subreddits: List[str],
@@ -38,9 +110,11 @@ async def scrape_subreddits(
     limit: int,
     include_comments: bool,
     max_comments_per_post: int,
+    max_concurrency: int = MAX_CONCURRENT_SUBREDDITS,
+    on_posts: Optional[Callable[[str, List[Dict]], Awaitable[None]]] = None,
 ) -> List[Dict]:
     """
-    Scrape multiple subreddits
+    Scrape multiple subreddits concurrently
 
     Args:
         reddit_service: RedditService instance
@@ -50,43 +124,69 @@ async def scrape_subreddits(
         limit: Max posts per subreddit
         include_comments: Whether to fetch comments
         max_comments_per_post: Max comments per post
+        max_concurrency: Max subreddits fetched at the same time
+        on_posts: Optional callback awaited with each subreddit's name and
+            posts as soon as they are scraped; its errors are not scrape
+            failures and propagate to the caller
 
     Returns:
         List of all scraped posts
     """
     all_posts = []
+    semaphore = asyncio.Semaphore(max_concurrency)
 
     Actor.log.info(f"Scraping {len(subreddits)} subreddit(s)")
 
-    for i, subreddit in enumerate(subreddits):
-        try:
-            posts = await reddit_service.get_posts_from_subreddit(
-                subreddit=subreddit,
-                sort=sort,
-                time_filter=time_filter,
-                limit=limit,
-            )
+    async def scrape_one(subreddit: str) -> Union[List[Dict], Exception]:
+        async with semaphore:
+            try:
+                # Random delay so concurrent requests don't hit Reddit in lockstep
+                await asyncio.sleep(random.uniform(0, DELAY_BETWEEN_SUBREDDITS_SECONDS))
+                posts = await reddit_service.get_posts_from_subreddit(
+                    subreddit=subreddit,
+                    sort=sort,
+                    time_filter=time_filter,
+                    limit=limit,
+                )
 
-            # Fetch comments if requested
-            if include_comments:
-                for post in posts:
-                    if post.get("num_comments", 0) > 0:
-                        comments = await reddit_service.get_comments_for_post(
-                            post_id=post["id"],
-                            subreddit=post["subreddit"],
-                            max_comments=max_comments_per_post,
-                        )
-                        post["comments"] = comments
+                # Fetch comments if requested
+                if include_comments:
+                    await fetch_comments_for_posts(
+                        reddit_service, posts, max_comments_per_post
+                    )
+            except Exception as e:
+                # Scrape failures are reported together once the batch is done
+                return e
 
-            all_posts.extend(posts)
+            # Outside the try: a failing callback (e.g. the dataset push)
+            # fails the whole run instead of counting as a scrape failure
+            if on_posts is not None:
+                await on_posts(subreddit, posts)
+
+            return posts
 
-            # Add delay between subreddits to be respectful
-            if i < len(subreddits) - 1:
-                await asyncio.sleep(DELAY_BETWEEN_SUBREDDITS_SECONDS)
+    tasks = [asyncio.ensure_future(scrape_one(subreddit)) for subreddit in subreddits]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # Don't leave the other subreddits running after on_posts failed
+        for task in tasks:
+            task.cancel()
+        raise
+
+    # Each subreddit fails independently; report all failures once at the end
+    failures = {}
+    for subreddit, result in zip(subreddits, results):
+        if isinstance(result, Exception):
+            failures[subreddit] = f"{type(result).__name__}: {result}"
+        else:
+            all_posts.extend(result)
 
-        except Exception as e:
-            Actor.log.error(f"Error scraping subreddit {subreddit}: {e}")
-            continue
+    if failures:
+        Actor.log.error(
+            f"Failed to scrape {len(failures)} of {len(subreddits)} subreddit(s)",
+            {"errors": failures},
+        )
 
     return all_posts
 
@@ -117,20 +217,15 @@ async def search_reddit(
 
     # Fetch comments if requested
     if include_comments:
-        for post in posts:
-            if post.get("num_comments", 0) > 0:
-                comments = await reddit_service.get_comments_for_post(
-                    post_id=post["id"],
-                    subreddit=post["subreddit"],
-                    max_comments=max_comments_per_post,
-                )
-                post["comments"] = comments
+        await fetch_comments_for_posts(reddit_service, posts, max_comments_per_post)
 
     return posts
 
 
 async def run_scraper(input_data: Dict[str, Any]):
     """Run the scraper logic (without Actor context manager)"""
+    started_at = time.perf_counter()
+
     # This function is called from main.py which manages the Actor context
     # Get input configuration (already passed as parameter)
 
@@ -142,6 +237,8 @@ async def run_scraper(input_data: Dict[str, Any]):
     limit = input_data.get("limit", DEFAULT_LIMIT)
     include_comments = input_data.get("includeComments", False)
     max_comments_per_post = input_data.get("maxCommentsPerPost", DEFAULT_MAX_COMMENTS)
+    max_concurrency = input_data.get("maxConcurrency", MAX_CONCURRENT_SUBREDDITS)
+    use_response_cache = input_data.get("useResponseCache", False)
 
     # Validate input
     try:
@@ -150,6 +247,8 @@ async def run_scraper(input_data: Dict[str, Any]):
         Actor.log.error(f"Input validation failed: {e}")
         await Actor.fail(exit_code=1)
         return
+    limit = int(limit)
+    max_concurrency = int(max_concurrency)
 
     Actor.log.info(
         "Starting Reddit scraper",
@@ -162,11 +261,61 @@ async def run_scraper(input_data: Dict[str, Any]):
         },
     )
 
-    # Initialize Reddit service
-    reddit_service = RedditService()
+    # Reuse the process-wide Reddit service (closed by the entry point)
+    reddit_service = get_reddit_service()
+    reddit_service.response_cache = None
+    if use_response_cache:
+        store = await Actor.open_key_value_store(name=RESPONSE_CACHE_STORE_NAME)
+        reddit_service.response_cache = ResponseCache(store)
 
     # Scrape data
     all_posts = []
+    saved_posts_count = 0
+
+    # CSV rows are rendered on a worker thread as each source is saved, so
+    # the CPU work overlaps with requests still in flight. Each source gets
+    # its own buffers, keyed by subreddit (None for search results), and they
+    # are joined in input order so the exports don't depend on which
+    # subreddit finished first
+    csv_executor = ThreadPoolExecutor(max_workers=1)
+    csv_chunks: Dict[Optional[str], List[asyncio.Future]] = {}
+    # Subreddits save concurrently; serializing the interim summary writes
+    # keeps an older, smaller count from landing after a newer one
+    summary_lock = asyncio.Lock()
+
+    def render_csv_rows(posts: List[Dict]) -> Tuple[str, str]:
+        posts_rows = io.StringIO()
+        export_posts_to_csv(posts, posts_rows, write_header=False)
+        comments_rows = io.StringIO()
+        if include_comments:
+            export_posts_with_comments_to_csv(posts, comments_rows, write_header=False)
+        return posts_rows.getvalue(), comments_rows.getvalue()
+
+    async def save_posts(source: Optional[str], posts: List[Dict]) -> None:
+        nonlocal saved_posts_count
+        await push_posts_to_dataset(posts)
+        if posts:
+            csv_chunks.setdefault(source, []).append(
+                asyncio.get_running_loop().run_in_executor(
+                    csv_executor, render_csv_rows, posts
+                )
+            )
+        saved_posts_count += len(posts)
+        # Keep the summary current so an interrupted run still reports progress
+        async with summary_lock:
+            # Read the counter under the lock so the latest total is written
+            try:
+                await save_summary(
+                    saved_posts_count,
+                    len(subreddits),
+                    search_query,
+                    started_at,
+                    finished=False,
+                )
+            except Exception as e:
+                # Best effort: the posts are already saved, and the next
+                # write (or the final one) brings the summary up to date
+                Actor.log.warning(f"Failed to save interim summary: {e}")
 
     try:
         # Scrape subreddits if provided
@@ -179,6 +328,8 @@ async def run_scraper(input_data: Dict[str, Any]):
                 limit=limit,
                 include_comments=include_comments,
                 max_comments_per_post=max_comments_per_post,
+                max_concurrency=max_concurrency,
+                on_posts=save_posts,
             )
             all_posts.extend(posts)
 
@@ -192,15 +343,11 @@ async def run_scraper(input_data: Dict[str, Any]):
                 include_comments=include_comments,
                 max_comments_per_post=max_comments_per_post,
             )
+            await save_posts(None, search_posts)
             all_posts.extend(search_posts)
 
-        # Save all posts to dataset
+        # Posts are pushed to the dataset as soon as each source is scraped
         if all_posts:
-            Actor.log.info(f"Saving {len(all_posts)} posts to dataset")
-
-            for post in all_posts:
-                await Actor.push_data(post)
-
             Actor.log.info(
                 f"Successfully scraped and saved {len(all_posts)} Reddit posts"
             )
@@ -208,30 +355,46 @@ async def run_scraper(input_data: Dict[str, Any]):
             # Generate CSV exports
             Actor.log.info("Generating CSV exports")
             try:
+                # Wait for the rows rendered in the background and join them in
+                # input order; the key-value store takes whole values, so each
+                # CSV is stored in one call
+                posts_csv = io.StringIO()
+                comments_csv = io.StringIO()
+                export_posts_to_csv((), posts_csv)
+                if include_comments:
+                    export_posts_with_comments_to_csv((), comments_csv)
+                # pop() so a subreddit listed twice is only written once
+                for source in [*subreddits, None]:
+                    chunks = await asyncio.gather(*csv_chunks.pop(source, ()))
+                    for posts_rows, comments_rows in chunks:
+                        posts_csv.write(posts_rows)
+                        comments_csv.write(comments_rows)
+
                 # Always save posts-only CSV
-                posts_csv_content = export_posts_to_csv(all_posts)
-                await Actor.set_value("reddit_scraper_output.csv", posts_csv_content)
+                await Actor.set_value("reddit_scraper_output.csv", posts_csv.getvalue())
                 Actor.log.info("CSV export (posts only) saved to key-value store")
 
                 # Save CSV with comments if comments were included
                 if include_comments:
-                    comments_csv_content = export_posts_with_comments_to_csv(all_posts)
-                    await Actor.set_value("reddit_scraper_output_with_comments.csv", comments_csv_content)
-                    Actor.log.info("CSV export (with comments) saved to key-value store")
+                    await Actor.set_value(
+                        "reddit_scraper_output_with_comments.csv",
+                        comments_csv.getvalue(),
+                    )
+                    Actor.log.info(
+                        "CSV export (with comments) saved to key-value store"
+                    )
             except Exception as e:
                 Actor.log.error(f"Error generating CSV export: {e}")
         else:
             Actor.log.warning("No posts were scraped. Check your input parameters.")
 
-        # Set summary statistics
-        await Actor.set_value(
-            "summary",
-            {
-                "totalPosts": len(all_posts),
-                "subredditsScraped": len(subreddits),
-                "searchQuery": search_query or None,
-                "timestamp": datetime.now().isoformat(),
-            },
+        # Set final summary statistics from the posts that reached the dataset
+        await save_summary(
+            saved_posts_count,
+            len(subreddits),
+            search_query,
+            started_at,
+            finished=True,
         )
 
     except Exception as e:
@@ -243,3 +406,5 @@ async def run_scraper(input_data: Dict[str, Any]):
             },
         )
         await Actor.fail(exit_code=1)
+    finally:
+        csv_executor.shutdown(wait=True)
@@ -0,0 +1,126 @@
+"""
+Reddit Rate Limiter
+Throttles requests using Reddit's x-ratelimit-* response headers
+and computes jittered backoff delays for retries
+"""
+
+import asyncio
+import random
+import time
+from typing import Mapping, Optional
+
+from apify import Actor
+
+from src.config import MAX_RETRY_AFTER_SECONDS, RATE_LIMIT_PROBE_INTERVAL_SECONDS
+
+
+def backoff_delay(
+    attempt: int, retry_delay: float, retry_after: Optional[str] = None
+) -> float:
+    """
+    Compute a retry delay with exponential backoff and jitter
+
+    Args:
+        attempt: Zero-based attempt number that just failed
+        retry_delay: Base delay in seconds
+        retry_after: Value of the Retry-After response header, if any
+            (capped at MAX_RETRY_AFTER_SECONDS)
+
+    Returns:
+        Number of seconds to wait before the next attempt
+    """
+    delay = retry_delay * (2**attempt)
+    if retry_after:
+        try:
+            delay = max(delay, min(float(retry_after), MAX_RETRY_AFTER_SECONDS))
+        except ValueError:
+            pass
+    # Jitter keeps concurrent requests from retrying in lockstep
+    return delay + random.uniform(0, 0.5 * retry_delay)
+
+
+class RedditRateLimiter:
+    """Request budget driven by Reddit's rate limit headers"""
+
+    def __init__(self):
+        """Initialize rate limiter with an unknown budget"""
+        # Requests left in the current window (None until Reddit reports it)
+        self.remaining: Optional[float] = None
+        # Requests allowed per window (used + remaining), once reported
+        self.window_size: Optional[float] = None
+        # time.monotonic() value at which the current window resets
+        self.reset_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        """
+        Get the lock for the running event loop
+
+        The limiter outlives a single asyncio.run() when the service is
+        reused by a warm process, and a contended lock stays bound to the
+        loop it was first used on, so each loop gets its own lock.
+
+        Returns:
+            Lock serializing acquire() calls on the running loop
+        """
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def acquire(self) -> None:
+        """Wait until the current rate limit window allows another request"""
+        async with self._get_lock():
+            if self.remaining is None:
+                return
+
+            while self.remaining < 1:
+                wait_time = self.reset_at - time.monotonic()
+                if wait_time <= 0:
+                    self._start_assumed_window()
+                    break
+                Actor.log.warning(
+                    f"Reddit rate limit reached, waiting {wait_time:.1f}s for reset"
+                )
+                await asyncio.sleep(wait_time)
+
+            self.remaining -= 1
+
+    def _start_assumed_window(self) -> None:
+        """
+        Assume a fresh window once the reported one has reset
+
+        Until a response reports the real budget, callers queued on the lock
+        get the last known window size, or one request per probe interval
+        when the size was never reported, instead of all passing at once.
+        """
+        if self.window_size:
+            self.remaining = self.window_size
+        else:
+            self.remaining = 1
+            self.reset_at = time.monotonic() + RATE_LIMIT_PROBE_INTERVAL_SECONDS
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """
+        Update the request budget from a Reddit response
+
+        Args:
+            headers: Response headers
+        """
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        if remaining is None or reset is None:
+            return
+
+        try:
+            self.remaining = float(remaining)
+            self.reset_at = time.monotonic() + float(reset)
+        except ValueError:
+            return
+
+        try:
+            self.window_size = self.remaining + float(headers["x-ratelimit-used"])
+        except (KeyError, ValueError):
+            pass
@@ -5,154 +5,375 @@ Uses Reddit's public API (no authentication required)
 """
 
 import asyncio
-from typing import Dict, List, Optional, Tuple
+import logging
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional, Tuple
 
 import aiohttp
+import orjson
 from apify import Actor
+from yarl import URL
 
 from src.config import (
+    COMMENTS_CACHE_TTL_SECONDS,
+    CURL_CFFI_IMPERSONATE,
     DELAY_BETWEEN_SUBREDDITS_SECONDS,
+    DNS_CACHE_TTL_SECONDS,
+    HTTP_BACKEND,
+    HTTP_CONNECT_TIMEOUT_SECONDS,
+    HTTP_CONNECTION_LIMIT,
+    HTTP_CONNECTION_LIMIT_PER_HOST,
+    HTTP_KEEPALIVE_TIMEOUT_SECONDS,
+    HTTP_READ_TIMEOUT_SECONDS,
+    HTTP_TOTAL_TIMEOUT_SECONDS,
     MAX_COMMENTS_PER_REQUEST,
+    MAX_CONCURRENT_COMMENT_REQUESTS,
     MAX_POSTS_PER_REQUEST,
     REDDIT_BASE_URL,
     REDDIT_USER_AGENT,
+    RETRY_STATUS_CODES,
     VALID_SORT_OPTIONS,
     VALID_TIME_FILTERS,
 )
+from src.services.rate_limiter import RedditRateLimiter, backoff_delay
+from src.services.response_cache import ResponseCache
 from src.utils.helpers import (
     clean_subreddit_name,
     normalize_comment_data,
     normalize_post_data,
 )
 
+# Reddit "thing" kind for comments and the body of deleted comments
+COMMENT_KIND = "t1"
+DELETED_BODY = "[deleted]"
+
+
+@lru_cache(maxsize=64)
+def build_listing_query(
+    sort: str = "new", time_filter: str = "day", limit: int = 25
+) -> str:
+    """
+    Build the encoded query string of a subreddit listing URL
+
+    It only depends on options that are fixed for a whole scrape, so one
+    string is shared by the URLs of every subreddit.
+
+    Args:
+        sort: Sort order (new, hot, top, rising)
+        time_filter: Time filter for 'top' sort
+        limit: Number of posts to fetch
+
+    Returns:
+        Query string without the leading "?"
+    """
+    query = f"limit={min(limit, MAX_POSTS_PER_REQUEST)}"
+    if sort == "top" and time_filter in VALID_TIME_FILTERS:
+        query += f"&t={time_filter}"
+    return query
+
+
+@lru_cache(maxsize=1024)
+def build_subreddit_url(
+    base_url: URL,
+    subreddit: str,
+    sort: str = "new",
+    time_filter: str = "day",
+    limit: int = 25,
+) -> URL:
+    """
+    Build Reddit API URL for subreddit posts
+
+    Args:
+        base_url: Reddit base URL
+        subreddit: Subreddit name (will be cleaned)
+        sort: Sort order (new, hot, top, rising)
+        time_filter: Time filter for 'top' sort
+        limit: Number of posts to fetch
+
+    Returns:
+        Complete Reddit API URL (immutable, safe to cache)
+    """
+    clean_name = clean_subreddit_name(subreddit)
+    return (base_url / "r" / clean_name / f"{sort}.json").with_query(
+        build_listing_query(sort, time_filter, limit)
+    )
+
+
+@lru_cache(maxsize=1024)
+def build_search_url(
+    base_url: URL, query: str, sort: str = "new", limit: int = 25
+) -> URL:
+    """
+    Build Reddit search API URL
+
+    Args:
+        base_url: Reddit base URL
+        query: Search query (percent-encoded by yarl)
+        sort: Sort order
+        limit: Number of results
+
+    Returns:
+        Complete Reddit search API URL (immutable, safe to cache)
+    """
+    return (base_url / "search.json").with_query(
+        q=query, limit=str(min(limit, MAX_POSTS_PER_REQUEST)), sort=sort
+    )
+
+
+def _iter_listing_children(listing: Dict) -> Iterator[Dict]:
+    """
+    Iterate the children of a Reddit listing without copying the listing
+
+    Only the ``data.children`` path is walked; the rest of the decoded
+    response (pagination cursors, modhash, etc.) is never touched.
+
+    Args:
+        listing: Decoded Reddit listing object
+
+    Yields:
+        Raw child objects (each with "kind" and "data" keys)
+    """
+    listing_data = listing.get("data") if isinstance(listing, dict) else None
+    if not isinstance(listing_data, dict):
+        return
+    yield from listing_data.get("children") or ()
+
 
 class RedditService:
     """Service for Reddit API interactions (free, no auth required)"""
 
-    def __init__(self):
-        """Initialize Reddit service"""
+    def __init__(self, http_backend: str = HTTP_BACKEND):
+        """
+        Initialize Reddit service
+
+        Args:
+            http_backend: HTTP client to use, "aiohttp" or "curl_cffi"
+        """
+        if http_backend not in ("aiohttp", "curl_cffi"):
+            raise ValueError(f"Unsupported HTTP backend: {http_backend}")
+        self.http_backend = http_backend
         self.base_url = REDDIT_BASE_URL
+        # Parsed once; request URLs are derived from it without re-parsing
+        self._base_url = URL(REDDIT_BASE_URL)
         # Use browser-like headers to avoid 403 errors from Reddit
+        # Brotli is preferred for the JSON payloads; aiohttp decompresses it
+        # transparently when the speedups extra (Brotli) is installed
         self.headers = {
             "User-Agent": REDDIT_USER_AGENT,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+            "Accept": "application/json",
             "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate, br",
+            "Accept-Encoding": "br, gzip, deflate",
             "Connection": "keep-alive",
             "Upgrade-Insecure-Requests": "1",
         }
+        # Shared session so every request reuses pooled keep-alive connections
+        self._session: Optional[aiohttp.ClientSession] = None
+        # aiodns resolver passed to the connector, which doesn't close it
+        self._resolver: Optional[aiohttp.AsyncResolver] = None
+        # curl_cffi AsyncSession, only created when that backend is selected
+        self._curl_session: Optional[Any] = None
+        self._rate_limiter = RedditRateLimiter()
+        # Optional cache of decoded responses (disabled unless set)
+        self.response_cache: Optional[ResponseCache] = None
         Actor.log.info("Reddit service initialized (free, no authentication required)")
 
-    def _build_subreddit_url(
-        self,
-        subreddit: str,
-        sort: str = "new",
-        time_filter: str = "day",
-        limit: int = 25,
-    ) -> str:
-        """
-        Build Reddit API URL for subreddit posts
+    async def __aenter__(self) -> "RedditService":
+        """Open the shared HTTP session when entering the context"""
+        # The curl_cffi session is created on first request instead
+        if self.http_backend == "aiohttp":
+            await self._get_session()
+        return self
 
-        Args:
-            subreddit: Subreddit name (will be cleaned)
-            sort: Sort order (new, hot, top, rising)
-            time_filter: Time filter for 'top' sort
-            limit: Number of posts to fetch
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        """Close the shared HTTP session when leaving the context"""
+        await self.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the shared HTTP session, creating it on first use
 
         Returns:
-            Complete Reddit API URL
+            aiohttp ClientSession reused across all Reddit requests
         """
-        clean_name = clean_subreddit_name(subreddit)
-        url = f"{self.base_url}/r/{clean_name}/{sort}.json"
-        params = {"limit": str(min(limit, MAX_POSTS_PER_REQUEST))}
+        if self._session is None or self._session.closed:
+            if self._resolver is None:
+                self._resolver = aiohttp.AsyncResolver()
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                # Bound every attempt so one hung connection can't stall a batch
+                timeout=aiohttp.ClientTimeout(
+                    total=HTTP_TOTAL_TIMEOUT_SECONDS,
+                    # Not connect=, which also counts waiting for a free
+                    # pooled connection while other requests hold them all
+                    sock_connect=HTTP_CONNECT_TIMEOUT_SECONDS,
+                    sock_read=HTTP_READ_TIMEOUT_SECONDS,
+                ),
+                connector=aiohttp.TCPConnector(
+                    limit=HTTP_CONNECTION_LIMIT,
+                    limit_per_host=HTTP_CONNECTION_LIMIT_PER_HOST,
+                    # Resolve through aiodns instead of getaddrinfo in a thread
+                    resolver=self._resolver,
+                    use_dns_cache=True,
+                    ttl_dns_cache=DNS_CACHE_TTL_SECONDS,
+                    keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT_SECONDS,
+                ),
+            )
+        return self._session
 
-        if sort == "top" and time_filter in VALID_TIME_FILTERS:
-            params["t"] = time_filter
+    def _get_curl_session(self) -> Any:
+        """
+        Get the shared curl_cffi session, creating it on first use
 
-        query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-        return f"{url}?{query_string}"
+        curl_cffi is imported lazily so it stays an optional dependency.
+        The User-Agent and encoding headers are left to curl_cffi so they
+        match the impersonated browser's TLS fingerprint.
 
-    def _build_search_url(self, query: str, sort: str = "new", limit: int = 25) -> str:
+        Returns:
+            curl_cffi AsyncSession reused across all Reddit requests
         """
-        Build Reddit search API URL
+        if self._curl_session is None:
+            from curl_cffi.requests import AsyncSession
+
+            self._curl_session = AsyncSession(
+                impersonate=CURL_CFFI_IMPERSONATE,
+                headers={
+                    "Accept": self.headers["Accept"],
+                    "Accept-Language": self.headers["Accept-Language"],
+                },
+                timeout=HTTP_TOTAL_TIMEOUT_SECONDS,
+                max_clients=HTTP_CONNECTION_LIMIT_PER_HOST,
+            )
+        return self._curl_session
+
+    async def close(self) -> None:
+        """Close the shared HTTP session and release pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._resolver is not None:
+            await self._resolver.close()
+            self._resolver = None
+        if self._curl_session is not None:
+            await self._curl_session.close()
+            self._curl_session = None
+
+    async def _fetch(self, url: URL) -> Tuple[int, Mapping[str, str], bytes]:
+        """
+        Perform a single GET request with the configured HTTP backend
 
         Args:
-            query: Search query
-            sort: Sort order
-            limit: Number of results
+            url: URL to request, including its query string
 
         Returns:
-            Complete Reddit search API URL
+            Tuple of (status_code, response_headers, response_body)
         """
-        url = f"{self.base_url}/search.json"
-        params = {
-            "q": query,
-            "limit": str(min(limit, MAX_POSTS_PER_REQUEST)),
-            "sort": sort,
-        }
-        query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-        return f"{url}?{query_string}"
+        if self.http_backend == "curl_cffi":
+            response = await self._get_curl_session().get(str(url))
+            return (response.status_code, response.headers, response.content)
+
+        session = await self._get_session()
+        async with session.get(url) as response:
+            return (response.status, response.headers, await response.read())
+
+    def _build_subreddit_url(
+        self,
+        subreddit: str,
+        sort: str = "new",
+        time_filter: str = "day",
+        limit: int = 25,
+    ) -> URL:
+        """Build Reddit API URL for subreddit posts"""
+        return build_subreddit_url(self._base_url, subreddit, sort, time_filter, limit)
+
+    def _build_search_url(self, query: str, sort: str = "new", limit: int = 25) -> URL:
+        """Build Reddit search API URL"""
+        return build_search_url(self._base_url, query, sort, limit)
 
     async def _make_request_with_retry(
-        self, url: str, max_retries: int = 3, retry_delay: float = 2.0
+        self,
+        url: URL,
+        max_retries: int = 3,
+        retry_delay: float = 2.0,
+        cache_ttl: Optional[float] = None,
     ) -> Tuple[Optional[int], Optional[Dict]]:
         """
-        Make HTTP request with retry logic for 403 errors
+        Make HTTP request with rate limiting and retries
+
+        Requests wait for Reddit's rate limit window when the budget reported
+        in the x-ratelimit-* headers is exhausted. Retryable statuses (403,
+        429, 5xx) and network errors are retried with jittered exponential
+        backoff, honoring Retry-After when Reddit sends it.
+
+        When a response cache is set and a TTL is given, a fresh cached
+        response is returned without a request and successful responses
+        are stored in the cache.
 
         Args:
-            url: URL to request
+            url: URL to request, including its query string
             max_retries: Maximum number of retries
             retry_delay: Initial delay between retries (exponential backoff)
+            cache_ttl: Maximum age in seconds of a usable cached response
 
         Returns:
             Tuple of (status_code, response_data) or (None, None) if all retries failed
         """
+        cache = self.response_cache if cache_ttl else None
+        if cache is not None:
+            cached = await cache.get(url, cache_ttl)
+            if cached is not None:
+                return (200, cached)
+
         for attempt in range(max_retries):
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, headers=self.headers) as response:
-                        if response.status == 200:
-                            try:
-                                data = await response.json()
-                                return (response.status, data)
-                            except Exception as e:
-                                Actor.log.error(f"Failed to parse JSON response: {e}")
-                                return (response.status, None)
-                        elif response.status == 403 and attempt < max_retries - 1:
-                            # Wait before retrying with exponential backoff
-                            wait_time = retry_delay * (2 ** attempt)
-                            Actor.log.warning(
-                                f"Got 403 error, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})"
-                            )
-                            await asyncio.sleep(wait_time)
-                            continue
-                        else:
-                            # For non-200, non-403 statuses, try to read error text
-                            try:
-                                error_text = await response.text()
-                                return (response.status, {"error": error_text})
-                            except Exception:
-                                return (response.status, None)
+                await self._rate_limiter.acquire()
+                status, headers, body = await self._fetch(url)
+                self._rate_limiter.update(headers)
+                if status == 200:
+                    try:
+                        data = orjson.loads(body)
+                    except orjson.JSONDecodeError as e:
+                        Actor.log.error(f"Failed to parse JSON response: {e}")
+                        return (status, None)
+                    if cache is not None:
+                        await cache.set(url, data)
+                    return (status, data)
+                elif status in RETRY_STATUS_CODES and attempt < max_retries - 1:
+                    wait_time = backoff_delay(
+                        attempt, retry_delay, headers.get("Retry-After")
+                    )
+                else:
+                    # For non-200, non-retryable statuses, return the error text
+                    return (status, {"error": body.decode("utf-8", errors="replace")})
+
+                Actor.log.warning(
+                    f"Got {status} error, retrying in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})"
+                )
+                await asyncio.sleep(wait_time)
             except Exception as e:
+                reason = (
+                    "request timed out" if isinstance(e, asyncio.TimeoutError) else e
+                )
                 if attempt < max_retries - 1:
-                    wait_time = retry_delay * (2 ** attempt)
+                    wait_time = backoff_delay(attempt, retry_delay)
                     Actor.log.warning(
-                        f"Request failed, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries}): {e}"
+                        f"Request failed, retrying in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries}): {reason}"
                     )
                     await asyncio.sleep(wait_time)
                 else:
-                    Actor.log.error(f"Request failed after {max_retries} attempts: {e}")
+                    Actor.log.error(
+                        f"Request failed after {max_retries} attempts: {reason}"
+                    )
         return (None, None)
 
-    async def get_posts_from_subreddit(
+    async def iter_posts_from_subreddit(
         self,
         subreddit: str,
         sort: str = "new",
         time_filter: str = "day",
         limit: int = 25,
-    ) -> List[Dict]:
+    ) -> AsyncIterator[Dict]:
         """
-        Get posts from a subreddit
+        Iterate posts from a subreddit, normalizing each one as it is consumed
 
         Args:
             subreddit: Subreddit name (with or without r/ prefix)
@@ -160,46 +381,76 @@ class RedditService:
             time_filter: Time filter for 'top' sort
             limit: Number of posts to fetch (max 100)
 
-        Returns:
-            List of post dictionaries
+        Yields:
+            Post dictionaries
         """
         try:
             clean_name = clean_subreddit_name(subreddit)
             url = self._build_subreddit_url(clean_name, sort, time_filter, limit)
 
-            Actor.log.debug(f"Fetching posts from r/{clean_name}", {"url": url})
+            # Skip building debug messages and payloads unless they are logged
+            if Actor.log.isEnabledFor(logging.DEBUG):
+                Actor.log.debug(
+                    f"Fetching posts from r/{clean_name}", {"url": str(url)}
+                )
 
             status_code, data = await self._make_request_with_retry(url)
             if status_code is None or data is None:
-                Actor.log.error(f"Failed to fetch posts from r/{clean_name} after retries")
-                return []
+                Actor.log.error(
+                    f"Failed to fetch posts from r/{clean_name} after retries"
+                )
+                return
 
             if status_code == 200:
-                posts = []
-
-                if "data" in data and "children" in data["data"]:
-                    for child in data["data"]["children"]:
-                        post_data = child.get("data", {})
-                        normalized_post = normalize_post_data(
-                            post_data, "subreddit", clean_name
-                        )
-                        posts.append(normalized_post)
+                count = 0
+                for child in _iter_listing_children(data):
+                    yield normalize_post_data(
+                        child.get("data", {}), "subreddit", clean_name
+                    )
+                    count += 1
 
-                Actor.log.info(
-                    f"Fetched {len(posts)} posts from r/{clean_name}"
-                )
-                return posts
+                Actor.log.info(f"Fetched {count} posts from r/{clean_name}")
             else:
                 # Log response body for debugging 403 errors
-                error_text = data.get("error", "") if isinstance(data, dict) else str(data)
+                error_text = (
+                    data.get("error", "") if isinstance(data, dict) else str(data)
+                )
                 Actor.log.warning(
                     f"Reddit API returned status {status_code} for r/{clean_name}",
-                    {"response_preview": error_text[:200] if error_text else "No response body"}
+                    {
+                        "response_preview": (
+                            error_text[:200] if error_text else "No response body"
+                        )
+                    },
                 )
-                return []
         except Exception as e:
             Actor.log.error(f"Error fetching posts from r/{subreddit}: {e}")
-            return []
+
+    async def get_posts_from_subreddit(
+        self,
+        subreddit: str,
+        sort: str = "new",
+        time_filter: str = "day",
+        limit: int = 25,
+    ) -> List[Dict]:
+        """
+        Get posts from a subreddit
+
+        Args:
+            subreddit: Subreddit name (with or without r/ prefix)
+            sort: Sort order (new, hot, top, rising)
+            time_filter: Time filter for 'top' sort
+            limit: Number of posts to fetch (max 100)
+
+        Returns:
+            List of post dictionaries
+        """
+        return [
+            post
+            async for post in self.iter_posts_from_subreddit(
+                subreddit, sort, time_filter, limit
+            )
+        ]
 
     async def search_posts(
         self, query: str, sort: str = "new", limit: int = 25
@@ -218,7 +469,8 @@ class RedditService:
         try:
             url = self._build_search_url(query, sort, limit)
 
-            Actor.log.debug(f"Searching Reddit for: '{query}'", {"url": url})
+            if Actor.log.isEnabledFor(logging.DEBUG):
+                Actor.log.debug(f"Searching Reddit for: '{query}'", {"url": str(url)})
 
             status_code, data = await self._make_request_with_retry(url)
             if status_code is None or data is None:
@@ -226,26 +478,25 @@ class RedditService:
                 return []
 
             if status_code == 200:
-                posts = []
+                posts = [
+                    normalize_post_data(child.get("data", {}), "search", query)
+                    for child in _iter_listing_children(data)
+                ]
 
-                if "data" in data and "children" in data["data"]:
-                    for child in data["data"]["children"]:
-                        post_data = child.get("data", {})
-                        normalized_post = normalize_post_data(
-                            post_data, "search", query
-                        )
-                        posts.append(normalized_post)
-
-                Actor.log.info(
-                    f"Found {len(posts)} posts for search query: '{query}'"
-                )
+                Actor.log.info(f"Found {len(posts)} posts for search query: '{query}'")
                 return posts
             else:
                 # Log response body for debugging
-                error_text = data.get("error", "") if isinstance(data, dict) else str(data)
+                error_text = (
+                    data.get("error", "") if isinstance(data, dict) else str(data)
+                )
                 Actor.log.warning(
                     f"Reddit search API returned status {status_code}",
-                    {"response_preview": error_text[:200] if error_text else "No response body"}
+                    {
+                        "response_preview": (
+                            error_text[:200] if error_text else "No response body"
+                        )
+                    },
                 )
                 return []
         except Exception as e:
@@ -271,19 +522,26 @@ class RedditService:
 
         try:
             clean_name = clean_subreddit_name(subreddit)
-            url = f"{self.base_url}/r/{clean_name}/comments/{post_id}.json"
-            params = {"limit": str(min(max_comments, MAX_COMMENTS_PER_REQUEST))}
-            query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-            full_url = f"{url}?{query_string}"
-
-            Actor.log.debug(
-                f"Fetching comments for post {post_id}",
-                {"subreddit": clean_name, "max_comments": max_comments},
+            # Only top-level comments are kept, so don't download reply subtrees
+            url = (
+                self._base_url / "r" / clean_name / "comments" / f"{post_id}.json"
+            ).with_query(
+                limit=str(min(max_comments, MAX_COMMENTS_PER_REQUEST)), depth="1"
             )
 
-            status_code, data = await self._make_request_with_retry(full_url)
+            if Actor.log.isEnabledFor(logging.DEBUG):
+                Actor.log.debug(
+                    f"Fetching comments for post {post_id}",
+                    {"subreddit": clean_name, "max_comments": max_comments},
+                )
+
+            status_code, data = await self._make_request_with_retry(
+                url, cache_ttl=COMMENTS_CACHE_TTL_SECONDS
+            )
             if status_code is None or data is None:
-                Actor.log.error(f"Failed to fetch comments for post {post_id} after retries")
+                Actor.log.error(
+                    f"Failed to fetch comments for post {post_id} after retries"
+                )
                 return []
 
             if status_code == 200:
@@ -291,35 +549,109 @@ class RedditService:
 
                 # Reddit comments API returns array: [post data, comments data]
                 if isinstance(data, list) and len(data) > 1:
-                    comments_data = data[1].get("data", {}).get("children", [])
-
-                    for child in comments_data[:max_comments]:
-                        comment_data = child.get("data", {})
-
-                        # Skip "more" objects and deleted comments
-                        if (
-                            child.get("kind") == "t1"
-                            and comment_data.get("body")
-                            and comment_data.get("body") != "[deleted]"
-                        ):
-                            normalized_comment = normalize_comment_data(
-                                comment_data, post_id
-                            )
-                            comments.append(normalized_comment)
+                    for child in _iter_listing_children(data[1]):
+                        # Skip "more" objects before touching their data
+                        if child.get("kind") != COMMENT_KIND:
+                            continue
 
-                Actor.log.debug(
-                    f"Fetched {len(comments)} comments for post {post_id}"
-                )
+                        # Every t1 thing carries "data"; skip deleted and empty comments
+                        comment_data = child["data"]
+                        body = comment_data.get("body")
+                        if not body or body == DELETED_BODY:
+                            continue
+
+                        comments.append(normalize_comment_data(comment_data, post_id))
+
+                        # Stop as soon as enough comments survived filtering
+                        if len(comments) >= max_comments:
+                            break
+
+                if Actor.log.isEnabledFor(logging.DEBUG):
+                    Actor.log.debug(
+                        f"Fetched {len(comments)} comments for post {post_id}"
+                    )
                 return comments
             else:
                 # Log response body for debugging
-                error_text = data.get("error", "") if isinstance(data, dict) else str(data)
+                error_text = (
+                    data.get("error", "") if isinstance(data, dict) else str(data)
+                )
                 Actor.log.warning(
                     f"Failed to fetch comments for post {post_id}: "
                     f"status {status_code}",
-                    {"response_preview": error_text[:200] if error_text else "No response body"}
+                    {
+                        "response_preview": (
+                            error_text[:200] if error_text else "No response body"
+                        )
+                    },
                 )
                 return []
         except Exception as e:
             Actor.log.error(f"Error fetching comments for post {post_id}: {e}")
             return []
+
+    async def get_comments_for_posts(
+        self,
+        posts: List[Dict],
+        max_comments: int = 10,
+        concurrency: int = MAX_CONCURRENT_COMMENT_REQUESTS,
+    ) -> Dict[str, List[Dict]]:
+        """
+        Fetch comments for several posts in one batched call
+
+        Posts without comments are skipped; the remaining posts are fetched
+        concurrently over the shared session, at most `concurrency` at a time.
+
+        Args:
+            posts: List of normalized post dictionaries
+            max_comments: Maximum number of comments to fetch per post
+            concurrency: Maximum number of comment requests in flight
+
+        Returns:
+            Dictionary mapping post ID to its list of comment dictionaries
+        """
+        posts_with_comments = [
+            post for post in posts if post.get("num_comments", 0) > 0
+        ]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(post: Dict) -> List[Dict]:
+            async with semaphore:
+                return await self.get_comments_for_post(
+                    post_id=post["id"],
+                    subreddit=post["subreddit"],
+                    max_comments=max_comments,
+                )
+
+        results = await asyncio.gather(
+            *[fetch(post) for post in posts_with_comments], return_exceptions=True
+        )
+
+        comments_by_post = {}
+        for post, result in zip(posts_with_comments, results):
+            if isinstance(result, Exception):
+                Actor.log.error(
+                    f"Error fetching comments for post {post['id']}: {result}"
+                )
+                result = []
+            comments_by_post[post["id"]] = result
+        return comments_by_post
+
+
+_reddit_service: Optional[RedditService] = None
+
+
+def get_reddit_service() -> RedditService:
+    """
+    Get the shared RedditService, creating it on first use
+
+    Reusing the service keeps its connection pool and DNS cache warm
+    across scraper runs in the same process.
+
+    Returns:
+        Process-wide RedditService instance
+    """
+    global _reddit_service
+    if _reddit_service is None:
+        _reddit_service = RedditService()
+    return _reddit_service
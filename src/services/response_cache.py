@@ -0,0 +1,87 @@
+"""
+Response Cache
+Persists decoded Reddit responses in a key-value store so repeated runs
+can skip requests whose results are still fresh
+
+The store is named, so entries outlive the run that wrote them. An expired
+entry is deleted when it is next read; entries that are never read again
+stay until the store itself is deleted.
+"""
+
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
+from apify import Actor
+from apify.storages import KeyValueStore
+from yarl import URL
+
+
+def cache_key(url: URL) -> str:
+    """
+    Build the key-value store key for a request URL
+
+    Args:
+        url: Request URL, including its query string
+
+    Returns:
+        Hex digest of the URL (valid as a key-value store key)
+    """
+    return hashlib.blake2b(str(url).encode(), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """Time-limited cache of decoded Reddit responses"""
+
+    def __init__(self, store: KeyValueStore):
+        """
+        Initialize response cache
+
+        Args:
+            store: Key-value store the responses are kept in
+        """
+        self._store = store
+
+    async def get(self, url: URL, ttl: float) -> Optional[Any]:
+        """
+        Get a cached response if it is younger than the TTL
+
+        An expired entry is deleted from the store.
+
+        Args:
+            url: Request URL
+            ttl: Maximum age of the cached response in seconds
+
+        Returns:
+            Decoded response data, or None on a miss or expired entry
+        """
+        key = cache_key(url)
+        try:
+            entry: Optional[Dict] = await self._store.get_value(key)
+        except Exception as e:
+            Actor.log.warning(f"Failed to read response cache: {e}")
+            return None
+
+        if not entry:
+            return None
+        if time.time() - entry.get("t", 0) >= ttl:
+            try:
+                await self._store.delete_value(key)
+            except Exception as e:
+                Actor.log.warning(f"Failed to delete stale response cache entry: {e}")
+            return None
+        return entry.get("data")
+
+    async def set(self, url: URL, data: Any) -> None:
+        """
+        Store a decoded response
+
+        Args:
+            url: Request URL
+            data: Decoded response data
+        """
+        try:
+            entry = {"t": time.time(), "data": data}
+            await self._store.set_value(cache_key(url), entry)
+        except Exception as e:
+            Actor.log.warning(f"Failed to write response cache: {e}")
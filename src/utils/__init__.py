@@ -1 +1,25 @@
 """Utility functions for Reddit Scraper Actor"""
+
+from src.utils.helpers import (
+    RedditComment,
+    RedditPost,
+    clean_subreddit_name,
+    export_posts_to_csv,
+    export_posts_with_comments_to_csv,
+    format_timestamp,
+    normalize_comment_data,
+    normalize_post_data,
+    validate_input,
+)
+
+__all__ = [
+    "RedditComment",
+    "RedditPost",
+    "clean_subreddit_name",
+    "export_posts_to_csv",
+    "export_posts_with_comments_to_csv",
+    "format_timestamp",
+    "normalize_comment_data",
+    "normalize_post_data",
+    "validate_input",
+]
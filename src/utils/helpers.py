@@ -2,37 +2,188 @@
 Helper utility functions for Reddit Scraper Actor
 """
 
-import csv
-import io
-import json
-from datetime import datetime, timezone
-from typing import Any, Dict, List
-
+from __future__ import annotations
 
+import csv
+import time
+from functools import lru_cache
+from typing import IO, Any, Dict, Iterable, List, NotRequired, TypedDict
+
+from src.config import (
+    MAX_CONCURRENT_SUBREDDITS,
+    VALID_SORT_OPTIONS,
+    VALID_TIME_FILTERS,
+)
+
+# Set lookups for input validation
+_VALID_SORT_OPTIONS = frozenset(VALID_SORT_OPTIONS)
+_VALID_TIME_FILTERS = frozenset(VALID_TIME_FILTERS)
+
+
+class RedditComment(TypedDict):
+    """Normalized Reddit comment record"""
+
+    id: str
+    author: str
+    body: str
+    score: int
+    created_utc: float
+    created_at: str
+    permalink: str
+    is_submitter: bool
+    parent_id: str
+    post_id: str
+
+
+class RedditPost(TypedDict):
+    """Normalized Reddit post record"""
+
+    id: str
+    title: str
+    selftext: str
+    author: str
+    subreddit: str
+    score: int
+    upvote_ratio: float
+    num_comments: int
+    created_utc: float
+    created_at: str
+    url: str
+    permalink: str
+    is_self: bool
+    is_video: bool
+    thumbnail: str
+    domain: str
+    source_type: str
+    source_name: str
+    comments: NotRequired[List[RedditComment]]
+
+
+# Column order of the posts-only CSV export
+POST_CSV_COLUMNS = (
+    "id",
+    "title",
+    "selftext",
+    "author",
+    "subreddit",
+    "score",
+    "upvote_ratio",
+    "num_comments",
+    "created_utc",
+    "created_at",
+    "url",
+    "permalink",
+    "is_self",
+    "is_video",
+    "thumbnail",
+    "domain",
+    "source_type",
+    "source_name",
+)
+
+# Column order of the posts-with-comments CSV export
+POSTS_WITH_COMMENTS_CSV_COLUMNS = (
+    "post_id",
+    "post_title",
+    "post_selftext",
+    "post_author",
+    "subreddit",
+    "post_score",
+    "upvote_ratio",
+    "num_comments",
+    "post_created_utc",
+    "post_created_at",
+    "post_url",
+    "post_permalink",
+    "is_self",
+    "is_video",
+    "thumbnail",
+    "domain",
+    "source_type",
+    "source_name",
+    "comment_id",
+    "comment_author",
+    "comment_body",
+    "comment_score",
+    "comment_created_utc",
+    "comment_created_at",
+    "comment_permalink",
+    "is_submitter",
+    "row_type",  # "post" or "comment"
+)
+
+# (CSV column, record key, default) triples for the posts-with-comments export
+_POST_CSV_FIELDS = (
+    ("post_id", "id", ""),
+    ("post_title", "title", ""),
+    ("post_selftext", "selftext", ""),
+    ("post_author", "author", ""),
+    ("subreddit", "subreddit", ""),
+    ("post_score", "score", 0),
+    ("upvote_ratio", "upvote_ratio", 0),
+    ("num_comments", "num_comments", 0),
+    ("post_created_utc", "created_utc", 0),
+    ("post_created_at", "created_at", ""),
+    ("post_url", "url", ""),
+    ("post_permalink", "permalink", ""),
+    ("is_self", "is_self", False),
+    ("is_video", "is_video", False),
+    ("thumbnail", "thumbnail", ""),
+    ("domain", "domain", ""),
+    ("source_type", "source_type", ""),
+    ("source_name", "source_name", ""),
+)
+_COMMENT_CSV_FIELDS = (
+    ("comment_id", "id", ""),
+    ("comment_author", "author", ""),
+    ("comment_body", "body", ""),
+    ("comment_score", "score", 0),
+    ("comment_created_utc", "created_utc", 0),
+    ("comment_created_at", "created_at", ""),
+    ("comment_permalink", "permalink", ""),
+    ("is_submitter", "is_submitter", False),
+)
+
+# CSV spelling of booleans, indexed by the bool itself
+_BOOL = ("false", "true")
+
+# Comment columns of a post row, copied as the starting point of each row
+_EMPTY_COMMENT_FIELDS = {column: "" for column, _, _ in _COMMENT_CSV_FIELDS}
+_EMPTY_COMMENT_FIELDS["row_type"] = "post"
+
+
+@lru_cache(maxsize=256)
 def clean_subreddit_name(subreddit: str) -> str:
     """
     Clean subreddit name by removing r/ prefix if present
 
     Args:
-        subreddit: Subreddit name (with or without r/ prefix)
+        subreddit: Subreddit name (with or without r/ or /r/ prefix)
 
     Returns:
         Cleaned subreddit name without r/ prefix
     """
-    return subreddit.strip().lstrip("r/")
+    name = subreddit.strip().removeprefix("/")
+    while name.startswith("r/"):
+        name = name[2:]
+    return name
 
 
+@lru_cache(maxsize=8192)
 def format_timestamp(utc_timestamp: float) -> str:
     """
     Convert UTC timestamp to ISO format string
 
+    Reddit timestamps have whole-second precision, so sub-second parts are
+    dropped. Results are cached since many posts share a timestamp.
+
     Args:
         utc_timestamp: Unix timestamp in UTC
 
     Returns:
-        ISO format datetime string
+        ISO format datetime string (e.g. 2021-01-01T00:00:00+00:00)
     """
-    return datetime.fromtimestamp(utc_timestamp, tz=timezone.utc).isoformat()
+    return "%04d-%02d-%02dT%02d:%02d:%02d+00:00" % time.gmtime(int(utc_timestamp))[:6]
 
 
 def validate_input(input_data: Dict[str, Any]) -> None:
@@ -52,17 +203,39 @@ def validate_input(input_data: Dict[str, Any]) -> None:
         raise ValueError("Either 'subreddits' or 'searchQuery' must be provided")
 
     sort_by = input_data.get("sortBy", "new")
-    if sort_by not in ["new", "hot", "top", "rising"]:
+    if sort_by not in _VALID_SORT_OPTIONS:
+        raise ValueError(
+            f"Invalid sortBy: {sort_by}. Must be one of: {', '.join(VALID_SORT_OPTIONS)}"
+        )
+
+    time_filter = input_data.get("timeFilter", "day")
+    if time_filter not in _VALID_TIME_FILTERS:
         raise ValueError(
-            f"Invalid sortBy: {sort_by}. Must be one of: new, hot, top, rising"
+            f"Invalid timeFilter: {time_filter}. Must be one of: {', '.join(VALID_TIME_FILTERS)}"
         )
 
-    limit = input_data.get("limit", 25)
-    if not isinstance(limit, int) or limit < 1 or limit > 100:
+    # Numeric strings are accepted; callers convert the value with int()
+    try:
+        limit = int(input_data.get("limit", 25))
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer between 1 and 100") from None
+    if not 1 <= limit <= 100:
         raise ValueError("limit must be an integer between 1 and 100")
 
+    # 0 would create a semaphore nothing can ever acquire
+    try:
+        max_concurrency = int(
+            input_data.get("maxConcurrency", MAX_CONCURRENT_SUBREDDITS)
+        )
+    except (TypeError, ValueError):
+        raise ValueError("maxConcurrency must be an integer between 1 and 20") from None
+    if not 1 <= max_concurrency <= 20:
+        raise ValueError("maxConcurrency must be an integer between 1 and 20")
+
 
-def normalize_post_data(post_data: Dict, source_type: str, source_name: str) -> Dict:
+def normalize_post_data(
+    post_data: Dict, source_type: str, source_name: str
+) -> RedditPost:
     """
     Normalize Reddit post data to consistent format
 
@@ -74,29 +247,32 @@ def normalize_post_data(post_data: Dict, source_type: str, source_name: str) ->
     Returns:
         Normalized post dictionary
     """
+    # Bind the lookup once; this runs for every post in every listing
+    get = post_data.get
+    created_utc = get("created_utc", 0)
     return {
-        "id": post_data.get("id", ""),
-        "title": post_data.get("title", ""),
-        "selftext": post_data.get("selftext", ""),
-        "author": post_data.get("author", "[deleted]"),
-        "subreddit": post_data.get("subreddit", source_name),
-        "score": post_data.get("score", 0),
-        "upvote_ratio": post_data.get("upvote_ratio", 0),
-        "num_comments": post_data.get("num_comments", 0),
-        "created_utc": post_data.get("created_utc", 0),
-        "created_at": format_timestamp(post_data.get("created_utc", 0)),
-        "url": post_data.get("url", ""),
-        "permalink": f"https://reddit.com{post_data.get('permalink', '')}",
-        "is_self": post_data.get("is_self", False),
-        "is_video": post_data.get("is_video", False),
-        "thumbnail": post_data.get("thumbnail", ""),
-        "domain": post_data.get("domain", ""),
+        "id": get("id", ""),
+        "title": get("title", ""),
+        "selftext": get("selftext", ""),
+        "author": get("author", "[deleted]"),
+        "subreddit": get("subreddit", source_name),
+        "score": get("score", 0),
+        "upvote_ratio": get("upvote_ratio", 0),
+        "num_comments": get("num_comments", 0),
+        "created_utc": created_utc,
+        "created_at": format_timestamp(created_utc),
+        "url": get("url", ""),
+        "permalink": f"https://reddit.com{get('permalink', '')}",
+        "is_self": get("is_self", False),
+        "is_video": get("is_video", False),
+        "thumbnail": get("thumbnail", ""),
+        "domain": get("domain", ""),
         "source_type": source_type,
         "source_name": source_name,
     }
 
 
-def normalize_comment_data(comment_data: Dict, post_id: str) -> Dict:
+def normalize_comment_data(comment_data: Dict, post_id: str) -> RedditComment:
     """
     Normalize Reddit comment data to consistent format
 
@@ -107,191 +283,94 @@ def normalize_comment_data(comment_data: Dict, post_id: str) -> Dict:
     Returns:
         Normalized comment dictionary
     """
+    get = comment_data.get
+    created_utc = get("created_utc", 0)
     return {
-        "id": comment_data.get("id", ""),
-        "author": comment_data.get("author", "[deleted]"),
-        "body": comment_data.get("body", ""),
-        "score": comment_data.get("score", 0),
-        "created_utc": comment_data.get("created_utc", 0),
-        "created_at": format_timestamp(comment_data.get("created_utc", 0)),
-        "permalink": f"https://reddit.com{comment_data.get('permalink', '')}",
-        "is_submitter": comment_data.get("is_submitter", False),
-        "parent_id": comment_data.get("parent_id", ""),
+        "id": get("id", ""),
+        "author": get("author", "[deleted]"),
+        "body": get("body", ""),
+        "score": get("score", 0),
+        "created_utc": created_utc,
+        "created_at": format_timestamp(created_utc),
+        "permalink": f"https://reddit.com{get('permalink', '')}",
+        "is_submitter": get("is_submitter", False),
+        "parent_id": get("parent_id", ""),
         "post_id": post_id,
     }
 
 
-def export_posts_to_csv(posts: List[Dict]) -> str:
+def _csv_value(value: Any) -> Any:
     """
-    Export posts to CSV format following Apify's standard format
+    Convert a field value to its CSV representation
 
     Args:
-        posts: List of post dictionaries
+        value: Raw field value
 
     Returns:
-        CSV string with all posts and comments
+        Lowercase "true"/"false" for booleans, the value unchanged otherwise
+        (csv writes None as an empty string)
     """
-    if not posts:
-        return ""
-
-    # Define CSV columns for posts
-    post_columns = [
-        "id",
-        "title",
-        "selftext",
-        "author",
-        "subreddit",
-        "score",
-        "upvote_ratio",
-        "num_comments",
-        "created_utc",
-        "created_at",
-        "url",
-        "permalink",
-        "is_self",
-        "is_video",
-        "thumbnail",
-        "domain",
-        "source_type",
-        "source_name",
-    ]
-
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=post_columns, extrasaction="ignore")
-    writer.writeheader()
-
-    # Write posts
-    for post in posts:
-        # Create a copy of post without comments for the main row
-        post_row = {k: v for k, v in post.items() if k != "comments"}
-        
-        # Convert boolean values to strings for CSV
-        for key in ["is_self", "is_video"]:
-            if key in post_row:
-                post_row[key] = str(post_row[key]).lower()
-        
-        # Convert None values to empty strings
-        for key in post_row:
-            if post_row[key] is None:
-                post_row[key] = ""
-        
-        writer.writerow(post_row)
+    if type(value) is bool:
+        return _BOOL[value]
+    return value
+
 
-    return output.getvalue()
+def export_posts_to_csv(
+    posts: Iterable[Dict], out: IO[str], write_header: bool = True
+) -> None:
+    """
+    Export posts to CSV format following Apify's standard format
 
+    Rows are written to the stream one post at a time, so the caller decides
+    whether the CSV ends up in memory, in a file or elsewhere.
 
-def export_posts_with_comments_to_csv(posts: List[Dict]) -> str:
+    Args:
+        posts: Iterable of post dictionaries
+        out: Writable text stream the CSV is written to
+        write_header: Whether to write the header row (False when appending)
+    """
+    writer = csv.writer(out)
+    if write_header:
+        writer.writerow(POST_CSV_COLUMNS)
+
+    # Comments and any other extra keys are skipped by reading only the columns
+    for post in posts:
+        get = post.get
+        writer.writerow([_csv_value(get(column)) for column in POST_CSV_COLUMNS])
+
+
+def export_posts_with_comments_to_csv(
+    posts: Iterable[Dict], out: IO[str], write_header: bool = True
+) -> None:
     """
     Export posts with comments to CSV format.
     Creates separate rows for each comment, with post data repeated.
 
     Args:
-        posts: List of post dictionaries (may include comments)
-
-    Returns:
-        CSV string with posts and comments as separate rows
+        posts: Iterable of post dictionaries (may include comments)
+        out: Writable text stream the CSV is written to
+        write_header: Whether to write the header row (False when appending)
     """
-    if not posts:
-        return ""
-
-    # Define CSV columns including comment fields
-    columns = [
-        "post_id",
-        "post_title",
-        "post_selftext",
-        "post_author",
-        "subreddit",
-        "post_score",
-        "upvote_ratio",
-        "num_comments",
-        "post_created_utc",
-        "post_created_at",
-        "post_url",
-        "post_permalink",
-        "is_self",
-        "is_video",
-        "thumbnail",
-        "domain",
-        "source_type",
-        "source_name",
-        "comment_id",
-        "comment_author",
-        "comment_body",
-        "comment_score",
-        "comment_created_utc",
-        "comment_created_at",
-        "comment_permalink",
-        "is_submitter",
-        "row_type",  # "post" or "comment"
-    ]
-
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=columns, extrasaction="ignore")
-    writer.writeheader()
+    writer = csv.DictWriter(out, fieldnames=POSTS_WITH_COMMENTS_CSV_COLUMNS)
+    if write_header:
+        writer.writeheader()
 
     for post in posts:
-        # Prepare post data
-        post_data = {
-            "post_id": post.get("id", ""),
-            "post_title": post.get("title", ""),
-            "post_selftext": post.get("selftext", ""),
-            "post_author": post.get("author", ""),
-            "subreddit": post.get("subreddit", ""),
-            "post_score": post.get("score", 0),
-            "upvote_ratio": post.get("upvote_ratio", 0),
-            "num_comments": post.get("num_comments", 0),
-            "post_created_utc": post.get("created_utc", 0),
-            "post_created_at": post.get("created_at", ""),
-            "post_url": post.get("url", ""),
-            "post_permalink": post.get("permalink", ""),
-            "is_self": str(post.get("is_self", False)).lower(),
-            "is_video": str(post.get("is_video", False)).lower(),
-            "thumbnail": post.get("thumbnail", ""),
-            "domain": post.get("domain", ""),
-            "source_type": post.get("source_type", ""),
-            "source_name": post.get("source_name", ""),
-            "comment_id": "",
-            "comment_author": "",
-            "comment_body": "",
-            "comment_score": "",
-            "comment_created_utc": "",
-            "comment_created_at": "",
-            "comment_permalink": "",
-            "is_submitter": "",
-            "row_type": "post",
-        }
-
-        # Convert None values to empty strings
-        for key in post_data:
-            if post_data[key] is None:
-                post_data[key] = ""
-
-        # Write post row
-        writer.writerow(post_data)
-
-        # Write comment rows if comments exist
-        comments = post.get("comments", [])
-        if comments:
-            for comment in comments:
-                comment_row = post_data.copy()
-                comment_row.update({
-                    "comment_id": comment.get("id", ""),
-                    "comment_author": comment.get("author", ""),
-                    "comment_body": comment.get("body", ""),
-                    "comment_score": comment.get("score", 0),
-                    "comment_created_utc": comment.get("created_utc", 0),
-                    "comment_created_at": comment.get("created_at", ""),
-                    "comment_permalink": comment.get("permalink", ""),
-                    "is_submitter": str(comment.get("is_submitter", False)).lower(),
-                    "row_type": "comment",
-                })
-
-                # Convert None values to empty strings
-                for key in comment_row:
-                    if comment_row[key] is None:
-                        comment_row[key] = ""
-
-                writer.writerow(comment_row)
-
-    return output.getvalue()
+        get = post.get
+        post_row = dict(_EMPTY_COMMENT_FIELDS)
+        post_row.update(
+            (column, _csv_value(get(key, default)))
+            for column, key, default in _POST_CSV_FIELDS
+        )
+        writer.writerow(post_row)
+
+        # Comment rows repeat the post fields and fill in the comment ones
+        for comment in get("comments") or ():
+            comment_get = comment.get
+            comment_row = post_row.copy()
+            comment_row.update(
+                (column, _csv_value(comment_get(key, default)))
+                for column, key, default in _COMMENT_CSV_FIELDS
+            )
+            comment_row["row_type"] = "comment"
+            writer.writerow(comment_row)
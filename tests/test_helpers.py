@@ -2,37 +2,79 @@
 Unit tests for helper utility functions
 """
 
+import csv
+import io
 from datetime import datetime, timezone
+from types import MappingProxyType
 
 import pytest
 
 from src.utils.helpers import (
     clean_subreddit_name,
+    export_posts_to_csv,
+    export_posts_with_comments_to_csv,
     format_timestamp,
     normalize_comment_data,
     normalize_post_data,
     validate_input,
 )
 
+# Raw Reddit payloads shared by the normalization tests (read-only)
+FULL_POST = MappingProxyType(
+    {
+        "id": "abc123",
+        "title": "Test Post",
+        "selftext": "Test content",
+        "author": "testuser",
+        "subreddit": "test",
+        "score": 100,
+        "upvote_ratio": 0.95,
+        "num_comments": 50,
+        "created_utc": 1609459200,
+        "url": "https://example.com",
+        "permalink": "/r/test/comments/abc123/test_post/",
+        "is_self": True,
+        "is_video": False,
+        "thumbnail": "https://example.com/thumb.jpg",
+        "domain": "self.test",
+    }
+)
+FULL_COMMENT = MappingProxyType(
+    {
+        "id": "def456",
+        "author": "commenter",
+        "body": "Great post!",
+        "score": 25,
+        "created_utc": 1609459200,
+        "permalink": "/r/test/comments/abc123/test_post/def456/",
+        "is_submitter": False,
+        "parent_id": "t3_abc123",
+    }
+)
+EMPTY_DATA = MappingProxyType({})
+
 
 class TestCleanSubredditName:
     """Tests for clean_subreddit_name function"""
 
-    def test_removes_r_prefix(self):
-        assert clean_subreddit_name("r/python") == "python"
-        assert clean_subreddit_name("r/learnpython") == "learnpython"
-
-    def test_keeps_name_without_prefix(self):
-        assert clean_subreddit_name("python") == "python"
-        assert clean_subreddit_name("learnpython") == "learnpython"
-
-    def test_handles_whitespace(self):
-        assert clean_subreddit_name("  r/python  ") == "python"
-        assert clean_subreddit_name("  python  ") == "python"
-
-    def test_handles_multiple_r_prefixes(self):
-        # The function strips all "r/" prefixes, so "rr/python" becomes "python"
-        assert clean_subreddit_name("rr/python") == "python"
+    @pytest.mark.parametrize(
+        "subreddit, expected",
+        [
+            ("r/python", "python"),
+            ("python", "python"),
+            ("  r/python  ", "python"),
+            ("  python  ", "python"),
+            ("r/r/python", "python"),
+            ("/r/python", "python"),
+            # Only the "r/" prefix is removed, not leading "r" characters
+            ("rust", "rust"),
+            ("r/rust", "rust"),
+            ("rr/python", "rr/python"),
+            ("r/" * 50 + "python", "python"),
+        ],
+    )
+    def test_cleans_name(self, subreddit, expected):
+        assert clean_subreddit_name(subreddit) == expected
 
 
 class TestFormatTimestamp:
@@ -41,15 +83,31 @@ class TestFormatTimestamp:
     def test_formats_timestamp_correctly(self):
         timestamp = 1609459200  # 2021-01-01 00:00:00 UTC
         result = format_timestamp(timestamp)
-        assert isinstance(result, str)
+        assert type(result) is str
         assert "2021-01-01" in result
         assert "T" in result  # ISO format includes T
 
     def test_handles_zero_timestamp(self):
         result = format_timestamp(0)
-        assert isinstance(result, str)
+        assert type(result) is str
         assert "1970-01-01" in result
 
+    @pytest.mark.parametrize("timestamp", [0, 1609459200, 1700000123.0])
+    def test_matches_datetime_isoformat(self, timestamp):
+        expected = datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+        assert format_timestamp(timestamp) == expected
+
+    def test_drops_sub_second_precision(self):
+        assert format_timestamp(1609459200.75) == "2021-01-01T00:00:00+00:00"
+
+    def test_caches_repeated_timestamps(self):
+        format_timestamp.cache_clear()
+        format_timestamp(1609459200)
+        format_timestamp(1609459200)
+
+        cache_info = format_timestamp.cache_info()
+        assert (cache_info.hits, cache_info.misses) == (1, 1)
+
 
 class TestValidateInput:
     """Tests for validate_input function"""
@@ -76,113 +134,163 @@ class TestValidateInput:
         with pytest.raises(ValueError, match="Invalid sortBy"):
             validate_input(input_data)
 
-    def test_validates_valid_sort_options(self):
-        for sort in ["new", "hot", "top", "rising"]:
-            input_data = {"subreddits": ["python"], "sortBy": sort}
-            validate_input(input_data)  # Should not raise
+    @pytest.mark.parametrize("sort", ["new", "hot", "top", "rising"])
+    def test_validates_valid_sort_options(self, sort):
+        validate_input({"subreddits": ["python"], "sortBy": sort})
 
-    def test_raises_error_for_invalid_limit(self):
-        input_data = {"subreddits": ["python"], "limit": 0}
+    @pytest.mark.parametrize("limit", [0, 101, "many", None])
+    def test_raises_error_for_invalid_limit(self, limit):
+        input_data = {"subreddits": ["python"], "limit": limit}
         with pytest.raises(
             ValueError, match="limit must be an integer between 1 and 100"
         ):
             validate_input(input_data)
 
-        input_data = {"subreddits": ["python"], "limit": 101}
-        with pytest.raises(
-            ValueError, match="limit must be an integer between 1 and 100"
-        ):
-            validate_input(input_data)
+    @pytest.mark.parametrize("limit", [1, 100, "25"])
+    def test_validates_valid_limit(self, limit):
+        validate_input({"subreddits": ["python"], "limit": limit})
 
-        input_data = {"subreddits": ["python"], "limit": "25"}
+    @pytest.mark.parametrize("max_concurrency", [0, 21, "many", None])
+    def test_raises_error_for_invalid_max_concurrency(self, max_concurrency):
+        input_data = {"subreddits": ["python"], "maxConcurrency": max_concurrency}
         with pytest.raises(
-            ValueError, match="limit must be an integer between 1 and 100"
+            ValueError, match="maxConcurrency must be an integer between 1 and 20"
         ):
             validate_input(input_data)
 
-    def test_validates_valid_limit(self):
-        for limit in [1, 25, 50, 100]:
-            input_data = {"subreddits": ["python"], "limit": limit}
-            validate_input(input_data)  # Should not raise
+    @pytest.mark.parametrize("max_concurrency", [1, 20, "5"])
+    def test_validates_valid_max_concurrency(self, max_concurrency):
+        validate_input({"subreddits": ["python"], "maxConcurrency": max_concurrency})
+
+    def test_raises_error_for_invalid_time_filter(self):
+        input_data = {"subreddits": ["python"], "timeFilter": "decade"}
+        with pytest.raises(ValueError, match="Invalid timeFilter"):
+            validate_input(input_data)
 
 
 class TestNormalizePostData:
     """Tests for normalize_post_data function"""
 
-    def test_normalizes_post_data_correctly(self):
-        post_data = {
-            "id": "abc123",
-            "title": "Test Post",
-            "selftext": "Test content",
-            "author": "testuser",
-            "subreddit": "test",
-            "score": 100,
-            "upvote_ratio": 0.95,
-            "num_comments": 50,
-            "created_utc": 1609459200,
-            "url": "https://example.com",
-            "permalink": "/r/test/comments/abc123/test_post/",
-            "is_self": True,
-            "is_video": False,
-            "thumbnail": "https://example.com/thumb.jpg",
-            "domain": "self.test",
-        }
-
-        result = normalize_post_data(post_data, "subreddit", "test")
-
-        assert result["id"] == "abc123"
-        assert result["title"] == "Test Post"
-        assert result["author"] == "testuser"
-        assert result["subreddit"] == "test"
-        assert result["score"] == 100
-        assert result["source_type"] == "subreddit"
-        assert result["source_name"] == "test"
+    @pytest.mark.parametrize(
+        "post_data, source_type, source_name, expected",
+        [
+            (
+                FULL_POST,
+                "subreddit",
+                "test",
+                {
+                    "id": "abc123",
+                    "title": "Test Post",
+                    "author": "testuser",
+                    "subreddit": "test",
+                    "score": 100,
+                    "source_type": "subreddit",
+                    "source_name": "test",
+                },
+            ),
+            (
+                EMPTY_DATA,
+                "search",
+                "query",
+                {
+                    "id": "",
+                    "title": "",
+                    "author": "[deleted]",
+                    "score": 0,
+                    "source_type": "search",
+                    "source_name": "query",
+                },
+            ),
+        ],
+        ids=["full", "missing_fields"],
+    )
+    def test_normalizes_post_data(self, post_data, source_type, source_name, expected):
+        result = normalize_post_data(post_data, source_type, source_name)
+
+        assert {key: result[key] for key in expected} == expected
         assert "reddit.com" in result["permalink"]
-        assert isinstance(result["created_at"], str)
-
-    def test_handles_missing_fields(self):
-        post_data = {}
-        result = normalize_post_data(post_data, "search", "query")
-
-        assert result["id"] == ""
-        assert result["title"] == ""
-        assert result["author"] == "[deleted]"
-        assert result["score"] == 0
-        assert result["source_type"] == "search"
-        assert result["source_name"] == "query"
+        assert type(result["created_at"]) is str
 
 
 class TestNormalizeCommentData:
     """Tests for normalize_comment_data function"""
 
-    def test_normalizes_comment_data_correctly(self):
-        comment_data = {
-            "id": "def456",
-            "author": "commenter",
-            "body": "Great post!",
-            "score": 25,
-            "created_utc": 1609459200,
-            "permalink": "/r/test/comments/abc123/test_post/def456/",
-            "is_submitter": False,
-            "parent_id": "t3_abc123",
-        }
-
+    @pytest.mark.parametrize(
+        "comment_data, expected",
+        [
+            (
+                FULL_COMMENT,
+                {
+                    "id": "def456",
+                    "author": "commenter",
+                    "body": "Great post!",
+                    "score": 25,
+                    "post_id": "abc123",
+                },
+            ),
+            (
+                EMPTY_DATA,
+                {
+                    "id": "",
+                    "author": "[deleted]",
+                    "body": "",
+                    "score": 0,
+                    "post_id": "abc123",
+                },
+            ),
+        ],
+        ids=["full", "missing_fields"],
+    )
+    def test_normalizes_comment_data(self, comment_data, expected):
         result = normalize_comment_data(comment_data, "abc123")
 
-        assert result["id"] == "def456"
-        assert result["author"] == "commenter"
-        assert result["body"] == "Great post!"
-        assert result["score"] == 25
-        assert result["post_id"] == "abc123"
+        assert {key: result[key] for key in expected} == expected
         assert "reddit.com" in result["permalink"]
-        assert isinstance(result["created_at"], str)
-
-    def test_handles_missing_fields(self):
-        comment_data = {}
-        result = normalize_comment_data(comment_data, "abc123")
-
-        assert result["id"] == ""
-        assert result["author"] == "[deleted]"
-        assert result["body"] == ""
-        assert result["score"] == 0
-        assert result["post_id"] == "abc123"
+        assert type(result["created_at"]) is str
+
+
+class TestExportPostsToCsv:
+    """Tests for the CSV export functions"""
+
+    def test_writes_posts_to_stream(self):
+        post = normalize_post_data(
+            {"id": "abc123", "title": "Test Post", "is_self": True, "thumbnail": None},
+            "subreddit",
+            "python",
+        )
+        post["comments"] = [normalize_comment_data({"id": "c1"}, "abc123")]
+        out = io.StringIO()
+
+        export_posts_to_csv([post], out)
+
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        assert len(rows) == 1
+        assert rows[0]["id"] == "abc123"
+        assert rows[0]["is_self"] == "true"
+        assert rows[0]["is_video"] == "false"
+        assert rows[0]["thumbnail"] == ""
+        assert "comments" not in rows[0]
+        assert "comments" in post
+
+    def test_writes_comment_rows_to_stream(self):
+        post = normalize_post_data({"id": "abc123"}, "subreddit", "python")
+        post["comments"] = [normalize_comment_data({"id": "c1"}, "abc123")]
+        out = io.StringIO()
+
+        export_posts_with_comments_to_csv([post], out)
+
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        assert [row["row_type"] for row in rows] == ["post", "comment"]
+        assert rows[1]["post_id"] == "abc123"
+        assert rows[1]["comment_id"] == "c1"
+        assert rows[1]["is_submitter"] == "false"
+
+    def test_appends_rows_without_header(self):
+        out = io.StringIO()
+        export_posts_to_csv((), out)
+        for post_id in ("a", "b"):
+            post = normalize_post_data({"id": post_id}, "subreddit", "python")
+            export_posts_to_csv([post], out, write_header=False)
+
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        assert [row["id"] for row in rows] == ["a", "b"]
@@ -0,0 +1,339 @@
+"""
+Unit tests for the scraper orchestration in src.main
+"""
+
+import asyncio
+import csv
+import io
+
+import pytest
+
+import src.main as scraper_main
+from src.main import run_scraper, scrape_subreddits
+
+
+class _FakeLog:
+    """Records log calls as (level, message, extra) tuples"""
+
+    def __init__(self):
+        self.records = []
+
+    def _record(self, level, message, extra=None):
+        self.records.append((level, message, extra))
+
+    def info(self, message, extra=None):
+        self._record("info", message, extra)
+
+    def warning(self, message, extra=None):
+        self._record("warning", message, extra)
+
+    def error(self, message, extra=None):
+        self._record("error", message, extra)
+
+
+class _FakeActor:
+    """Stand-in for the Apify Actor that keeps pushed items and stored values"""
+
+    def __init__(self):
+        self.log = _FakeLog()
+        self.pushed = []
+        self.values = {}
+        self.failed_with = None
+
+    async def push_data(self, items):
+        self.pushed.append(list(items))
+
+    async def set_value(self, key, value):
+        self.values.setdefault(key, []).append(value)
+
+    async def fail(self, exit_code=1):
+        self.failed_with = exit_code
+
+
+class _FakeRedditService:
+    """
+    Serves canned posts per subreddit and tracks concurrent listing requests
+
+    A subreddit mapped to an exception raises it; delays (seconds) control
+    the order in which concurrent subreddits finish.
+    """
+
+    def __init__(self, posts_by_subreddit, delays=None):
+        self.posts_by_subreddit = posts_by_subreddit
+        self.delays = delays or {}
+        self.response_cache = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def get_posts_from_subreddit(self, subreddit, sort, time_filter, limit):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(subreddit, 0))
+            posts = self.posts_by_subreddit[subreddit]
+            if isinstance(posts, BaseException):
+                raise posts
+            return [dict(post) for post in posts]
+        finally:
+            self.in_flight -= 1
+
+    async def search_posts(self, query, sort, limit):
+        return [{"id": f"search-{query}", "subreddit": "all"}]
+
+    async def get_comments_for_posts(self, posts, max_comments):
+        return {
+            post["id"]: [{"id": f"{post['id']}-c1", "body": "comment"}]
+            for post in posts
+        }
+
+
+def _posts(subreddit, count=1):
+    """Minimal normalized posts for one subreddit"""
+    return [{"id": f"{subreddit}-{i}", "subreddit": subreddit} for i in range(count)]
+
+
+@pytest.fixture
+def fake_actor(monkeypatch):
+    """Replace the Actor used by src.main with a recording fake"""
+    actor = _FakeActor()
+    monkeypatch.setattr(scraper_main, "Actor", actor)
+    # No random delay before each subreddit request
+    monkeypatch.setattr(scraper_main, "DELAY_BETWEEN_SUBREDDITS_SECONDS", 0)
+    return actor
+
+
+@pytest.fixture
+def fake_service(monkeypatch):
+    """
+    Make get_reddit_service() return a fake service for the current test
+
+    Returns a callable taking _FakeRedditService arguments and returning
+    the installed fake.
+    """
+
+    def install(*args, **kwargs):
+        service = _FakeRedditService(*args, **kwargs)
+        monkeypatch.setattr(scraper_main, "get_reddit_service", lambda: service)
+        return service
+
+    return install
+
+
+class TestScrapeSubreddits:
+    """Tests for scrape_subreddits"""
+
+    async def test_bounds_concurrent_subreddits(self, fake_actor):
+        subreddits = [f"sub{i}" for i in range(5)]
+        service = _FakeRedditService(
+            {name: _posts(name) for name in subreddits},
+            delays={name: 0.01 for name in subreddits},
+        )
+
+        posts = await scrape_subreddits(
+            service, subreddits, "new", "day", 25, False, 0, max_concurrency=2
+        )
+
+        assert service.peak_in_flight == 2
+        assert [post["id"] for post in posts] == [f"{name}-0" for name in subreddits]
+
+    async def test_hands_each_subreddit_to_on_posts_when_scraped(self, fake_actor):
+        service = _FakeRedditService(
+            {"slow": _posts("slow"), "fast": _posts("fast", 2)},
+            delays={"slow": 0.02},
+        )
+        received = []
+
+        async def on_posts(subreddit, posts):
+            received.append((subreddit, [post["id"] for post in posts]))
+
+        await scrape_subreddits(
+            service, ["slow", "fast"], "new", "day", 25, False, 0, on_posts=on_posts
+        )
+
+        # Called as each subreddit finishes, not after the whole batch
+        assert received == [("fast", ["fast-0", "fast-1"]), ("slow", ["slow-0"])]
+
+    async def test_on_posts_errors_propagate(self, fake_actor):
+        service = _FakeRedditService({"a": _posts("a"), "b": _posts("b")})
+
+        async def on_posts(subreddit, posts):
+            raise RuntimeError(f"push failed for {subreddit}")
+
+        with pytest.raises(RuntimeError, match="push failed"):
+            await scrape_subreddits(
+                service, ["a", "b"], "new", "day", 25, False, 0, on_posts=on_posts
+            )
+
+    async def test_reports_all_failures_in_one_error(self, fake_actor):
+        service = _FakeRedditService(
+            {
+                "ok": _posts("ok"),
+                "broken": RuntimeError("boom"),
+                "gone": KeyError("data"),
+            }
+        )
+
+        posts = await scrape_subreddits(
+            service, ["broken", "ok", "gone"], "new", "day", 25, False, 0
+        )
+
+        # A failing subreddit doesn't stop the others
+        assert [post["id"] for post in posts] == ["ok-0"]
+        errors = [r for r in fake_actor.log.records if r[0] == "error"]
+        assert errors == [
+            (
+                "error",
+                "Failed to scrape 2 of 3 subreddit(s)",
+                {
+                    "errors": {
+                        "broken": "RuntimeError: boom",
+                        "gone": "KeyError: 'data'",
+                    }
+                },
+            )
+        ]
+
+
+class TestRunScraper:
+    """Tests for run_scraper"""
+
+    async def test_converts_max_concurrency(self, fake_actor, fake_service):
+        subreddits = ["a", "b", "c"]
+        service = fake_service(
+            {name: _posts(name) for name in subreddits},
+            delays={name: 0.01 for name in subreddits},
+        )
+
+        await run_scraper({"subreddits": subreddits, "maxConcurrency": "1"})
+
+        assert service.peak_in_flight == 1
+        assert fake_actor.failed_with is None
+
+    async def test_pushes_each_source_in_one_call(self, fake_actor, fake_service):
+        fake_service(
+            {"slow": _posts("slow", 2), "fast": _posts("fast", 3)},
+            delays={"slow": 0.02},
+        )
+
+        await run_scraper({"subreddits": ["slow", "fast"], "searchQuery": "q"})
+
+        assert [[post["id"] for post in batch] for batch in fake_actor.pushed] == [
+            ["fast-0", "fast-1", "fast-2"],
+            ["slow-0", "slow-1"],
+            ["search-q"],
+        ]
+
+    async def test_fails_run_when_push_fails(
+        self, fake_actor, fake_service, monkeypatch
+    ):
+        fake_service({"a": _posts("a"), "b": _posts("b")})
+        push_data = fake_actor.push_data
+
+        async def failing_push_data(items):
+            if items[0]["subreddit"] == "b":
+                raise RuntimeError("dataset unavailable")
+            await push_data(items)
+
+        monkeypatch.setattr(fake_actor, "push_data", failing_push_data)
+
+        await run_scraper({"subreddits": ["a", "b"]})
+
+        # A lost dataset push is not a scrape failure of that subreddit
+        assert fake_actor.failed_with == 1
+        assert not any(
+            message.startswith("Failed to scrape")
+            for _, message, _ in fake_actor.log.records
+        )
+
+    async def test_interim_summary_failure_is_not_a_scrape_failure(
+        self, fake_actor, fake_service, monkeypatch
+    ):
+        fake_service({"a": _posts("a"), "b": _posts("b")}, delays={"b": 0.01})
+        set_value = fake_actor.set_value
+        summary_writes = iter([RuntimeError("store unavailable")])
+
+        async def flaky_set_value(key, value):
+            if key == "summary":
+                error = next(summary_writes, None)
+                if error is not None:
+                    raise error
+            await set_value(key, value)
+
+        monkeypatch.setattr(fake_actor, "set_value", flaky_set_value)
+
+        await run_scraper({"subreddits": ["a", "b"]})
+
+        assert fake_actor.failed_with is None
+        records = [(level, message) for level, message, _ in fake_actor.log.records]
+        warning = "Failed to save interim summary: store unavailable"
+        assert ("warning", warning) in records
+        assert not any(message.startswith("Failed to scrape") for _, message in records)
+        final_summary = fake_actor.values["summary"][-1]
+        assert final_summary["finished"] is True
+        assert final_summary["totalPosts"] == 2
+
+    async def test_interim_summaries_never_go_backwards(
+        self, fake_actor, fake_service, monkeypatch
+    ):
+        subreddits = ["a", "b", "c", "d"]
+        fake_service({name: _posts(name) for name in subreddits})
+        # Later writes complete faster, so unserialized writes would land
+        # out of order and an older, smaller count would win
+        write_delays = iter([0.04, 0.03, 0.02, 0.01, 0])
+        set_value = fake_actor.set_value
+
+        async def slow_set_value(key, value):
+            if key == "summary":
+                await asyncio.sleep(next(write_delays))
+            await set_value(key, value)
+
+        monkeypatch.setattr(fake_actor, "set_value", slow_set_value)
+
+        await run_scraper({"subreddits": subreddits})
+
+        summaries = fake_actor.values["summary"]
+        counts = [summary["totalPosts"] for summary in summaries]
+        assert counts == sorted(counts)
+        assert [summary["finished"] for summary in summaries] == [False] * 4 + [True]
+        # The last interim write and the final one report every saved post
+        assert counts[-2:] == [4, 4]
+        assert summaries[-1]["subredditsScraped"] == 4
+
+    async def test_joins_csv_exports_in_input_order(self, fake_actor, fake_service):
+        fake_service(
+            {"slow": _posts("slow", 2), "fast": _posts("fast")},
+            delays={"slow": 0.02},
+        )
+
+        await run_scraper(
+            {
+                "subreddits": ["slow", "fast"],
+                "searchQuery": "q",
+                "includeComments": True,
+            }
+        )
+
+        # Sources finished fast, slow, search; the CSVs follow the input
+        (posts_csv,) = fake_actor.values["reddit_scraper_output.csv"]
+        rows = list(csv.DictReader(io.StringIO(posts_csv)))
+        assert [row["id"] for row in rows] == ["slow-0", "slow-1", "fast-0", "search-q"]
+
+        (comments_csv,) = fake_actor.values["reddit_scraper_output_with_comments.csv"]
+        rows = list(csv.DictReader(io.StringIO(comments_csv)))
+        assert [(row["post_id"], row["row_type"]) for row in rows[:2]] == [
+            ("slow-0", "post"),
+            ("slow-0", "comment"),
+        ]
+        assert len(rows) == 8
+
+        final_summary = fake_actor.values["summary"][-1]
+        assert final_summary["finished"] is True
+        assert final_summary["totalPosts"] == 4
+
+    async def test_rejects_invalid_max_concurrency(self, fake_actor, fake_service):
+        fake_service({"a": _posts("a")})
+
+        await run_scraper({"subreddits": ["a"], "maxConcurrency": 0})
+
+        assert fake_actor.failed_with == 1
+        assert fake_actor.pushed == []
@@ -0,0 +1,147 @@
+"""
+Unit tests for the Reddit rate limiter
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.config import MAX_RETRY_AFTER_SECONDS, RATE_LIMIT_PROBE_INTERVAL_SECONDS
+from src.services.rate_limiter import RedditRateLimiter, backoff_delay
+
+
+class TestBackoffDelay:
+    """Tests for backoff_delay function"""
+
+    def test_grows_exponentially(self):
+        with patch("random.uniform", return_value=0):
+            assert backoff_delay(0, 2.0) == 2.0
+            assert backoff_delay(2, 2.0) == 8.0
+
+    def test_honors_retry_after(self):
+        with patch("random.uniform", return_value=0):
+            assert backoff_delay(0, 2.0, "30") == 30.0
+            # A shorter Retry-After never shortens the backoff
+            assert backoff_delay(2, 2.0, "1") == 8.0
+
+    def test_caps_retry_after(self):
+        with patch("random.uniform", return_value=0):
+            assert backoff_delay(0, 2.0, "86400") == MAX_RETRY_AFTER_SECONDS
+
+    def test_ignores_invalid_retry_after(self):
+        with patch("random.uniform", return_value=0):
+            assert backoff_delay(0, 2.0, "Wed, 21 Oct 2015 07:28:00 GMT") == 2.0
+
+    def test_adds_bounded_jitter(self):
+        delay = backoff_delay(0, 2.0)
+        assert 2.0 <= delay <= 3.0
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """
+    Replace the limiter's clock and asyncio.sleep with a fake clock
+
+    Returns the list of slept durations; sleeping advances the clock.
+    """
+    now = [1000.0]
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(round(seconds, 6))
+        now[0] += seconds
+
+    monkeypatch.setattr(
+        "src.services.rate_limiter.time", SimpleNamespace(monotonic=lambda: now[0])
+    )
+    monkeypatch.setattr("asyncio.sleep", sleep)
+    return sleeps
+
+
+class TestRedditRateLimiter:
+    """Tests for RedditRateLimiter class"""
+
+    def test_update_reads_rate_limit_headers(self):
+        limiter = RedditRateLimiter()
+        limiter.update({"x-ratelimit-remaining": "99.0", "x-ratelimit-reset": "60"})
+
+        assert limiter.remaining == 99.0
+        assert limiter.reset_at > time.monotonic() + 59
+
+    def test_update_ignores_missing_headers(self):
+        limiter = RedditRateLimiter()
+        limiter.update({})
+
+        assert limiter.remaining is None
+
+    async def test_acquire_consumes_budget(self):
+        limiter = RedditRateLimiter()
+        limiter.update({"x-ratelimit-remaining": "2", "x-ratelimit-reset": "60"})
+
+        with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            await limiter.acquire()
+
+        assert limiter.remaining == 1
+        mock_sleep.assert_not_awaited()
+
+    async def test_acquire_waits_for_reset_when_exhausted(self, fake_clock):
+        limiter = RedditRateLimiter()
+        limiter.update(
+            {
+                "x-ratelimit-remaining": "0",
+                "x-ratelimit-reset": "30",
+                "x-ratelimit-used": "100",
+            }
+        )
+
+        await limiter.acquire()
+
+        assert fake_clock == [30.0]
+        # The new window is assumed to be as large as the last one
+        assert limiter.remaining == 99
+
+    async def test_acquire_paces_requests_when_window_size_unknown(self, fake_clock):
+        limiter = RedditRateLimiter()
+        limiter.update({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "30"})
+
+        for _ in range(3):
+            await limiter.acquire()
+
+        # Queued callers pass one per probe interval, not all at once
+        assert fake_clock == [
+            30.0,
+            RATE_LIMIT_PROBE_INTERVAL_SECONDS,
+            RATE_LIMIT_PROBE_INTERVAL_SECONDS,
+        ]
+
+    async def test_acquire_uses_budget_reported_after_reset(self, fake_clock):
+        limiter = RedditRateLimiter()
+        limiter.update({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "1"})
+        await limiter.acquire()
+        limiter.update({"x-ratelimit-remaining": "5", "x-ratelimit-reset": "60"})
+
+        await limiter.acquire()
+
+        assert fake_clock == [1.0]
+        assert limiter.remaining == 4
+
+    def test_acquire_works_across_event_loops(self):
+        limiter = RedditRateLimiter()
+
+        async def contend():
+            # An exhausted budget makes the first caller sleep holding the
+            # lock, so the second one waits on it and binds it to the loop
+            limiter.update(
+                {
+                    "x-ratelimit-remaining": "0",
+                    "x-ratelimit-reset": "0.01",
+                    "x-ratelimit-used": "2",
+                }
+            )
+            await asyncio.gather(limiter.acquire(), limiter.acquire())
+
+        asyncio.run(contend())
+        asyncio.run(contend())
@@ -2,247 +2,474 @@
 Unit tests for RedditService
 """
 
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import re
+import sys
+from types import MappingProxyType, ModuleType, SimpleNamespace
+from unittest.mock import AsyncMock, patch
 
+import orjson
 import pytest
-from aiohttp import ClientResponse
+from multidict import CIMultiDict
+from yarl import URL
+
+from src.config import (
+    HTTP_CONNECT_TIMEOUT_SECONDS,
+    HTTP_READ_TIMEOUT_SECONDS,
+    HTTP_TOTAL_TIMEOUT_SECONDS,
+)
+
+
+def _listing(*datas, kind="t3"):
+    """Wrap copies of raw thing data in a fresh Reddit listing envelope"""
+    return {
+        "data": {"children": [{"kind": kind, "data": dict(data)} for data in datas]}
+    }
+
+
+# Read-only thing data; tests build the listings they serve with _listing(),
+# and comment threads are [post listing, comment listing]
+POST_DATA = MappingProxyType(
+    {
+        "id": "test123",
+        "title": "Test Post",
+        "author": "testuser",
+        "subreddit": "python",
+        "score": 100,
+        "created_utc": 1609459200,
+    }
+)
+COMMENT_DATA = MappingProxyType(
+    {
+        "id": "comment123",
+        "author": "commenter",
+        "body": "Great post!",
+        "score": 10,
+        "created_utc": 1609459200,
+        "permalink": "/r/test/comments/abc123/",
+    }
+)
+
+# Expected wire encodings of the search queries in test_build_search_url
+SPACED_QUERY_RE = re.compile(r"[?&]q=python(?:\+|%20)tutorial(?:&|$)")
+ESCAPED_QUERY_RE = re.compile(r"[?&]q=python\+%26\+tutorial(?:&|$)")
+
+
+class _FakeResponse:
+    """Minimal stand-in for the aiohttp response used by RedditService"""
+
+    def __init__(self, status, payload=b"", headers=None):
+        self.status = status
+        self.headers = CIMultiDict(headers or {})
+        self._body = payload if isinstance(payload, bytes) else orjson.dumps(payload)
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+class _FakeSession:
+    """Serves queued responses in order and records the requested URLs"""
+
+    closed = False
+
+    def __init__(self, responses):
+        self._responses = iter(responses)
+        self.requested_urls = []
+
+    def get(self, url):
+        self.requested_urls.append(url)
+        response = next(self._responses)
+        if isinstance(response, BaseException):
+            raise response
+        return response
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def patched_session(monkeypatch):
+    """
+    Make aiohttp.ClientSession return a fake session for the current test
+
+    Returns a callable taking one response per expected request, each a
+    (status, payload[, headers]) tuple or an exception to raise, and
+    returning the fake session.
+    """
+    holder = {}
+    monkeypatch.setattr(
+        "aiohttp.ClientSession", lambda *args, **kwargs: holder["session"]
+    )
+
+    def make(*responses):
+        holder["session"] = _FakeSession(
+            (
+                response
+                if isinstance(response, BaseException)
+                else _FakeResponse(*response)
+            )
+            for response in responses
+        )
+        return holder["session"]
 
-from src.services.reddit_service import RedditService
+    return make
 
 
 class TestRedditService:
     """Tests for RedditService class"""
 
     @pytest.fixture
-    def reddit_service(self):
-        """Create a RedditService instance for testing"""
-        return RedditService()
+    def reddit_service_cls(self):
+        """Return the RedditService class, imported on first use"""
+        # Imported here so collecting other test modules doesn't load aiohttp
+        from src.services.reddit_service import RedditService
+
+        return RedditService
+
+    @pytest.fixture
+    async def reddit_service(self, reddit_service_cls):
+        """Create a RedditService instance and close it after the test"""
+        service = reddit_service_cls()
+        yield service
+        await service.close()
 
     def test_init(self, reddit_service):
         """Test RedditService initialization"""
-        assert reddit_service.base_url == "https://www.reddit.com"
+        # old.reddit.com serves lighter JSON than www.reddit.com
+        assert reddit_service.base_url == "https://old.reddit.com"
         assert "User-Agent" in reddit_service.headers
 
-    def test_build_subreddit_url(self, reddit_service):
+    def test_get_reddit_service_returns_shared_instance(self, reddit_service_cls):
+        """Test the process-wide service is created once and reused"""
+        from src.services.reddit_service import get_reddit_service
+
+        assert isinstance(get_reddit_service(), reddit_service_cls)
+        assert get_reddit_service() is get_reddit_service()
+
+    async def test_context_manager_closes_session(self, reddit_service_cls):
+        """Test the shared session is opened on enter and closed on exit"""
+        async with reddit_service_cls() as service:
+            session = service._session
+            assert session is not None and not session.closed
+
+        assert session.closed
+        assert service._session is None
+
+    async def test_close_releases_dns_resolver(self, reddit_service, monkeypatch):
+        """Test close() closes the resolver the connector doesn't own"""
+        closed = []
+
+        class FakeResolver:
+            async def close(self):
+                closed.append(self)
+
+        monkeypatch.setattr("aiohttp.AsyncResolver", FakeResolver)
+        monkeypatch.setattr("aiohttp.TCPConnector", lambda **kwargs: None)
+        monkeypatch.setattr("aiohttp.ClientSession", lambda **kwargs: _FakeSession(()))
+
+        await reddit_service._get_session()
+        resolver = reddit_service._resolver
+        await reddit_service.close()
+
+        assert closed == [resolver]
+        assert reddit_service._resolver is None
+
+    async def test_session_bounds_socket_connect_not_pool_wait(
+        self, reddit_service, monkeypatch
+    ):
+        """Test the timeout bounds the handshake, not waiting for a connection"""
+        session_kwargs = {}
+
+        def fake_client_session(**kwargs):
+            session_kwargs.update(kwargs)
+            return _FakeSession(())
+
+        monkeypatch.setattr("aiohttp.TCPConnector", lambda **kwargs: None)
+        monkeypatch.setattr("aiohttp.ClientSession", fake_client_session)
+
+        await reddit_service._get_session()
+
+        timeout = session_kwargs["timeout"]
+        assert timeout.sock_connect == HTTP_CONNECT_TIMEOUT_SECONDS
+        # connect= would also count the wait for a free pooled connection
+        assert timeout.connect is None
+        assert timeout.sock_read == HTTP_READ_TIMEOUT_SECONDS
+        assert timeout.total == HTTP_TOTAL_TIMEOUT_SECONDS
+
+    async def test_context_manager_skips_aiohttp_session_for_curl_cffi(
+        self, reddit_service_cls
+    ):
+        """Test no aiohttp session is opened for the curl_cffi backend"""
+        async with reddit_service_cls(http_backend="curl_cffi") as service:
+            assert service._session is None
+
+    @pytest.mark.parametrize(
+        "args, path, query",
+        [
+            (("python", "new", "day", 25), "/r/python/new.json", {"limit": "25"}),
+            (("r/python", "hot", "day", 10), "/r/python/hot.json", {"limit": "10"}),
+            (
+                ("python", "top", "week", 50),
+                "/r/python/top.json",
+                {"limit": "50", "t": "week"},
+            ),
+            # Invalid time filters are dropped and limits are capped at 100
+            (("python", "top", "decade", 500), "/r/python/top.json", {"limit": "100"}),
+        ],
+    )
+    def test_build_subreddit_url(self, reddit_service, args, path, query):
         """Test subreddit URL building"""
-        url = reddit_service._build_subreddit_url("python", "new", "day", 25)
-        assert "r/python/new.json" in url
-        assert "limit=25" in url
-
-        url = reddit_service._build_subreddit_url("python", "top", "week", 50)
-        assert "r/python/top.json" in url
-        assert "limit=50" in url
-        assert "t=week" in url
-
-    def test_build_search_url(self, reddit_service):
+        url = reddit_service._build_subreddit_url(*args)
+        assert url.path == path
+        assert dict(url.query) == query
+
+    @pytest.mark.parametrize(
+        "query, sort, limit, encoded_query",
+        [
+            ("python tutorial", "new", 25, SPACED_QUERY_RE),
+            # Special characters are percent-encoded on the wire
+            ("python & tutorial", "top", 100, ESCAPED_QUERY_RE),
+        ],
+    )
+    def test_build_search_url(self, reddit_service, query, sort, limit, encoded_query):
         """Test search URL building"""
-        url = reddit_service._build_search_url("python tutorial", "new", 25)
-        assert "/search.json" in url
-        assert (
-            "q=python tutorial" in url
-            or "q=python+tutorial" in url
-            or "q=python%20tutorial" in url
-        )
-        assert "limit=25" in url
-        assert "sort=new" in url
-
-    @pytest.mark.asyncio
-    async def test_get_posts_from_subreddit_success(self, reddit_service):
-        """Test successful post fetching"""
-        mock_response_data = {
-            "data": {
-                "children": [
-                    {
-                        "data": {
-                            "id": "test123",
-                            "title": "Test Post",
-                            "author": "testuser",
-                            "subreddit": "python",
-                            "score": 100,
-                            "created_utc": 1609459200,
-                        }
-                    }
-                ]
-            }
-        }
+        url = reddit_service._build_search_url(query, sort, limit)
+        assert url.path == "/search.json"
+        assert dict(url.query) == {"q": query, "limit": str(limit), "sort": sort}
+        assert encoded_query.search(str(url))
+
+    @pytest.mark.parametrize(
+        "method, args",
+        [
+            ("get_posts_from_subreddit", ("python", "new", "day", 25)),
+            ("search_posts", ("python tutorial", "new", 25)),
+        ],
+    )
+    async def test_fetch_listing_success(
+        self, reddit_service, patched_session, method, args
+    ):
+        """Test successful post fetching and search"""
+        patched_session((200, _listing(POST_DATA)))
+
+        posts = await getattr(reddit_service, method)(*args)
 
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=mock_response_data)
+        assert len(posts) == 1
+        assert posts[0]["id"] == "test123"
+        assert posts[0]["title"] == "Test Post"
 
-        # Make get() return an async context manager
-        mock_get_context = AsyncMock()
-        mock_get_context.__aenter__ = AsyncMock(return_value=mock_response)
-        mock_get_context.__aexit__ = AsyncMock(return_value=None)
+    async def test_iter_posts_from_subreddit_yields_posts(self, reddit_service):
+        """Test posts can be consumed one at a time"""
+        mock_data = _listing({"id": "a"}, {"id": "b"})
 
-        mock_session = AsyncMock()
-        mock_session.get = MagicMock(return_value=mock_get_context)
-        mock_session.__aenter__ = AsyncMock(return_value=mock_session)
-        mock_session.__aexit__ = AsyncMock(return_value=None)
+        async def fake_request(url, **kwargs):
+            return (200, mock_data)
 
-        with patch("aiohttp.ClientSession", return_value=mock_session):
-            posts = await reddit_service.get_posts_from_subreddit(
-                "python", "new", "day", 25
-            )
+        with patch.object(reddit_service, "_make_request_with_retry", fake_request):
+            post_ids = [
+                post["id"]
+                async for post in reddit_service.iter_posts_from_subreddit("r/python")
+            ]
 
-        assert len(posts) == 1
-        assert posts[0]["id"] == "test123"
-        assert posts[0]["title"] == "Test Post"
+        assert post_ids == ["a", "b"]
 
-    @pytest.mark.asyncio
-    async def test_get_posts_from_subreddit_error(self, reddit_service):
+    async def test_get_posts_from_subreddit_error(
+        self, reddit_service, patched_session
+    ):
         """Test error handling in post fetching"""
-        mock_response = AsyncMock()
-        mock_response.status = 404
-
-        # Make get() return an async context manager
-        mock_get_context = AsyncMock()
-        mock_get_context.__aenter__ = AsyncMock(return_value=mock_response)
-        mock_get_context.__aexit__ = AsyncMock(return_value=None)
-
-        mock_session = AsyncMock()
-        mock_session.get = MagicMock(return_value=mock_get_context)
-        mock_session.__aenter__ = AsyncMock(return_value=mock_session)
-        mock_session.__aexit__ = AsyncMock(return_value=None)
-
-        with patch("aiohttp.ClientSession", return_value=mock_session):
-            posts = await reddit_service.get_posts_from_subreddit(
-                "invalid_subreddit", "new", "day", 25
-            )
+        patched_session((404, b"Not Found"))
+
+        posts = await reddit_service.get_posts_from_subreddit(
+            "invalid_subreddit", "new", "day", 25
+        )
 
         assert posts == []
 
-    @pytest.mark.asyncio
-    async def test_search_posts_success(self, reddit_service):
-        """Test successful search"""
-        mock_response_data = {
-            "data": {
-                "children": [
-                    {
-                        "data": {
-                            "id": "search123",
-                            "title": "Search Result",
-                            "author": "user",
-                            "subreddit": "python",
-                            "score": 50,
-                            "created_utc": 1609459200,
-                        }
-                    }
-                ]
-            }
-        }
+    async def test_request_retries_after_timeout(self, reddit_service, patched_session):
+        """Test that a timed out attempt is retried"""
+        session = patched_session(asyncio.TimeoutError(), (200, {"data": {}}))
 
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=mock_response_data)
+        status_code, data = await reddit_service._make_request_with_retry(
+            URL("https://old.reddit.com/r/python/new.json"), retry_delay=0
+        )
 
-        # Make get() return an async context manager
-        mock_get_context = AsyncMock()
-        mock_get_context.__aenter__ = AsyncMock(return_value=mock_response)
-        mock_get_context.__aexit__ = AsyncMock(return_value=None)
+        assert status_code == 200
+        assert data == {"data": {}}
+        assert len(session.requested_urls) == 2
 
-        mock_session = AsyncMock()
-        mock_session.get = MagicMock(return_value=mock_get_context)
-        mock_session.__aenter__ = AsyncMock(return_value=mock_session)
-        mock_session.__aexit__ = AsyncMock(return_value=None)
+    async def test_request_retries_rate_limited_response(
+        self, reddit_service, patched_session
+    ):
+        """Test that a 429 response is retried after Retry-After"""
+        patched_session((429, b"", {"Retry-After": "7"}), (200, {"data": {}}))
 
-        with patch("aiohttp.ClientSession", return_value=mock_session):
-            posts = await reddit_service.search_posts("python tutorial", "new", 25)
+        with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            status_code, data = await reddit_service._make_request_with_retry(
+                URL("https://old.reddit.com/r/python/new.json"), retry_delay=0
+            )
 
-        assert len(posts) == 1
-        assert posts[0]["id"] == "search123"
+        assert status_code == 200
+        assert data == {"data": {}}
+        mock_sleep.assert_awaited_once_with(7.0)
 
-    @pytest.mark.asyncio
-    async def test_get_comments_for_post_success(self, reddit_service):
-        """Test successful comment fetching"""
-        mock_response_data = [
-            {},  # Post data (not used)
-            {
-                "data": {
-                    "children": [
-                        {
-                            "kind": "t1",
-                            "data": {
-                                "id": "comment123",
-                                "author": "commenter",
-                                "body": "Great post!",
-                                "score": 10,
-                                "created_utc": 1609459200,
-                                "permalink": "/r/test/comments/abc123/",
-                            },
-                        }
-                    ]
-                }
-            },
-        ]
+    async def test_request_handles_invalid_json(self, reddit_service, patched_session):
+        """Test that an unparseable 200 response is not retried"""
+        session = patched_session((200, b"<html>not json</html>"))
+
+        status_code, data = await reddit_service._make_request_with_retry(
+            URL("https://old.reddit.com/r/python/new.json")
+        )
+
+        assert (status_code, data) == (200, None)
+        assert len(session.requested_urls) == 1
+
+    async def test_request_uses_curl_cffi_backend(
+        self, reddit_service_cls, monkeypatch
+    ):
+        """Test requests go through curl_cffi when that backend is selected"""
+        service = reddit_service_cls(http_backend="curl_cffi")
+
+        class FakeCurlSession:
+            def __init__(self, **kwargs):
+                self.kwargs = kwargs
+                self.closed = False
+
+            async def get(self, url):
+                return SimpleNamespace(
+                    status_code=200,
+                    headers={},
+                    content=orjson.dumps(_listing()),
+                )
+
+            async def close(self):
+                self.closed = True
+
+        # curl_cffi is an optional dependency, so serve a stand-in module
+        curl_requests = ModuleType("curl_cffi.requests")
+        curl_requests.AsyncSession = FakeCurlSession
+        curl_cffi = ModuleType("curl_cffi")
+        curl_cffi.requests = curl_requests
+        monkeypatch.setitem(sys.modules, "curl_cffi", curl_cffi)
+        monkeypatch.setitem(sys.modules, "curl_cffi.requests", curl_requests)
+
+        async with service:
+            assert service._session is None
+            status, data = await service._make_request_with_retry(
+                service._build_subreddit_url("python")
+            )
+            session = service._curl_session
 
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=mock_response_data)
+        assert status == 200
+        assert data == _listing()
+        assert session.kwargs["impersonate"]
+        assert session.closed
 
-        # Make get() return an async context manager
-        mock_get_context = AsyncMock()
-        mock_get_context.__aenter__ = AsyncMock(return_value=mock_response)
-        mock_get_context.__aexit__ = AsyncMock(return_value=None)
+    def test_init_rejects_unknown_backend(self, reddit_service_cls):
+        """Test an unsupported HTTP backend is rejected"""
+        with pytest.raises(ValueError, match="Unsupported HTTP backend"):
+            reddit_service_cls(http_backend="httpx")
 
-        mock_session = AsyncMock()
-        mock_session.get = MagicMock(return_value=mock_get_context)
-        mock_session.__aenter__ = AsyncMock(return_value=mock_session)
-        mock_session.__aexit__ = AsyncMock(return_value=None)
+    async def test_get_comments_for_post_success(self, reddit_service, patched_session):
+        """Test successful comment fetching"""
+        session = patched_session((200, [{}, _listing(COMMENT_DATA, kind="t1")]))
 
-        with patch("aiohttp.ClientSession", return_value=mock_session):
-            comments = await reddit_service.get_comments_for_post("abc123", "test", 10)
+        comments = await reddit_service.get_comments_for_post("abc123", "test", 10)
 
         assert len(comments) == 1
         assert comments[0]["id"] == "comment123"
         assert comments[0]["body"] == "Great post!"
+        # Reply subtrees are never requested
+        assert session.requested_urls[0].query["depth"] == "1"
 
-    @pytest.mark.asyncio
     async def test_get_comments_for_post_empty(self, reddit_service):
         """Test comment fetching with max_comments = 0"""
         comments = await reddit_service.get_comments_for_post("abc123", "test", 0)
         assert comments == []
 
-    @pytest.mark.asyncio
-    async def test_get_comments_for_post_filters_deleted(self, reddit_service):
+    async def test_get_comments_for_post_filters_deleted(
+        self, reddit_service, patched_session
+    ):
         """Test that deleted comments are filtered out"""
-        mock_response_data = [
-            {},
-            {
-                "data": {
-                    "children": [
-                        {
-                            "kind": "t1",
-                            "data": {
-                                "id": "comment123",
-                                "author": "commenter",
-                                "body": "[deleted]",
-                                "score": 10,
-                                "created_utc": 1609459200,
-                                "permalink": "/r/test/comments/abc123/",
-                            },
-                        }
-                    ]
-                }
-            },
+        deleted_comment = {**COMMENT_DATA, "body": "[deleted]"}
+        patched_session((200, [{}, _listing(deleted_comment, kind="t1")]))
+
+        comments = await reddit_service.get_comments_for_post("abc123", "test", 10)
+
+        # Deleted comments should be filtered out
+        assert len(comments) == 0
+
+    async def test_get_comments_for_post_caps_after_filtering(
+        self, reddit_service, patched_session
+    ):
+        """Test that skipped comments don't count towards max_comments"""
+        # Mixed kinds, so the children are spelled out instead of using _listing
+        comments_listing = {
+            "data": {
+                "children": [
+                    {"kind": "t1", "data": {"id": "deleted1", "body": "[deleted]"}},
+                    {"kind": "t1", "data": {"id": "comment1", "body": "First"}},
+                    {"kind": "more", "data": {"id": "more1"}},
+                    {"kind": "t1", "data": {"id": "comment2", "body": "Second"}},
+                    {"kind": "t1", "data": {"id": "comment3", "body": "Third"}},
+                ]
+            }
+        }
+        patched_session((200, [{}, comments_listing]))
+
+        comments = await reddit_service.get_comments_for_post("abc123", "test", 2)
+
+        assert [comment["id"] for comment in comments] == ["comment1", "comment2"]
+
+    async def test_get_comments_for_posts_skips_posts_without_comments(
+        self, reddit_service
+    ):
+        """Test batched comment fetching only requests posts with comments"""
+        posts = [
+            {"id": "abc123", "subreddit": "test", "num_comments": 3},
+            {"id": "def456", "subreddit": "test", "num_comments": 0},
         ]
+        comments = [{"id": "comment123", "body": "Great post!"}]
+        calls = []
 
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=mock_response_data)
+        async def fake_get_comments(post_id, subreddit, max_comments):
+            calls.append((post_id, subreddit, max_comments))
+            return comments
 
-        # Make get() return an async context manager
-        mock_get_context = AsyncMock()
-        mock_get_context.__aenter__ = AsyncMock(return_value=mock_response)
-        mock_get_context.__aexit__ = AsyncMock(return_value=None)
+        with patch.object(reddit_service, "get_comments_for_post", fake_get_comments):
+            comments_by_post = await reddit_service.get_comments_for_posts(posts, 5)
 
-        mock_session = AsyncMock()
-        mock_session.get = MagicMock(return_value=mock_get_context)
-        mock_session.__aenter__ = AsyncMock(return_value=mock_session)
-        mock_session.__aexit__ = AsyncMock(return_value=None)
+        assert comments_by_post == {"abc123": comments}
+        assert calls == [("abc123", "test", 5)]
 
-        with patch("aiohttp.ClientSession", return_value=mock_session):
-            comments = await reddit_service.get_comments_for_post("abc123", "test", 10)
+    async def test_get_comments_for_posts_bounds_concurrency(self, reddit_service):
+        """Test batched comment fetching respects the concurrency limit"""
+        posts = [
+            {"id": f"post{i}", "subreddit": "test", "num_comments": 1} for i in range(6)
+        ]
+        in_flight = 0
+        peak_in_flight = 0
+
+        async def fake_get_comments(post_id, subreddit, max_comments):
+            nonlocal in_flight, peak_in_flight
+            in_flight += 1
+            peak_in_flight = max(peak_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            if post_id == "post0":
+                raise RuntimeError("boom")
+            return [{"id": f"comment-{post_id}"}]
+
+        with patch.object(reddit_service, "get_comments_for_post", fake_get_comments):
+            comments_by_post = await reddit_service.get_comments_for_posts(
+                posts, 5, concurrency=2
+            )
 
-        # Deleted comments should be filtered out
-        assert len(comments) == 0
+        assert peak_in_flight == 2
+        # A failed post yields no comments instead of failing the batch
+        assert comments_by_post["post0"] == []
+        assert comments_by_post["post5"] == [{"id": "comment-post5"}]
@@ -0,0 +1,98 @@
+"""
+Unit tests for the response cache
+"""
+
+import time
+from unittest.mock import patch
+
+from yarl import URL
+
+from src.services.response_cache import ResponseCache, cache_key
+
+URL_A = URL("https://old.reddit.com/r/python/new.json?limit=25")
+COMMENT = {"id": "c1", "body": "Cached", "created_utc": 1609459200}
+
+
+class TestCacheKey:
+    """Tests for cache_key function"""
+
+    def test_is_stable_hex_digest(self):
+        assert cache_key(URL_A) == cache_key(URL(str(URL_A)))
+        assert len(cache_key(URL_A)) == 32
+        int(cache_key(URL_A), 16)
+
+    def test_differs_by_query(self):
+        assert cache_key(URL_A) != cache_key(URL_A.update_query(limit="50"))
+
+
+class _FakeStore:
+    """In-memory stand-in for an Apify key-value store"""
+
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+
+    async def get_value(self, key, default_value=None):
+        return self.values.get(key, default_value)
+
+    async def set_value(self, key, value, content_type=None):
+        self.values[key] = value
+
+    async def delete_value(self, key):
+        self.values.pop(key, None)
+
+
+class _BrokenStore:
+    """Key-value store whose every call fails"""
+
+    async def get_value(self, key, default_value=None):
+        raise RuntimeError("unavailable")
+
+    async def set_value(self, key, value, content_type=None):
+        raise RuntimeError("unavailable")
+
+    async def delete_value(self, key):
+        raise RuntimeError("unavailable")
+
+
+class TestResponseCache:
+    """Tests for ResponseCache class"""
+
+    async def test_returns_fresh_entry(self):
+        cache = ResponseCache(_FakeStore())
+        await cache.set(URL_A, {"a": 1})
+
+        assert await cache.get(URL_A, 60) == {"a": 1}
+
+    async def test_ignores_and_deletes_expired_entry(self):
+        expired_entry = {"t": time.time() - 120, "data": {"a": 1}}
+        store = _FakeStore({cache_key(URL_A): expired_entry})
+
+        assert await ResponseCache(store).get(URL_A, 60) is None
+        assert cache_key(URL_A) not in store.values
+
+    async def test_swallows_store_errors(self):
+        cache = ResponseCache(_BrokenStore())
+
+        assert await cache.get(URL_A, 60) is None
+        await cache.set(URL_A, {"a": 1})
+
+    async def test_service_skips_request_on_cache_hit(self):
+        from src.services.reddit_service import RedditService
+
+        service = RedditService()
+        service.response_cache = ResponseCache(_FakeStore())
+        await service.response_cache.set(
+            URL("https://old.reddit.com/r/python/comments/abc123.json").with_query(
+                limit="5", depth="1"
+            ),
+            [{}, {"data": {"children": [{"kind": "t1", "data": COMMENT}]}}],
+        )
+
+        # The service swallows errors, so a request would show up as no comments
+        async def fail_fetch(url):
+            raise AssertionError(f"unexpected request to {url}")
+
+        with patch.object(service, "_fetch", fail_fetch):
+            comments = await service.get_comments_for_post("abc123", "python", 5)
+
+        assert [comment["id"] for comment in comments] == ["c1"]